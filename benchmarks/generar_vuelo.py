@@ -0,0 +1,232 @@
+'''
+Generador de carpetas de vuelo sintéticas para las pruebas de rendimiento
+
+Crea en una carpeta los archivos típicos de un vuelo, con coordenadas coherentes entre sí (un relevamiento en líneas
+paralelas sobre un rectángulo, cuyo tamaño depende de la cantidad de imágenes):
+- imágenes jpg con datos EXIF (cámara, fecha y hora, exposición, ISO y coordenadas GPS)
+- plan de vuelo (.waypoints) y polígono del área (.poly)
+- registro de telemetría MAVLink (.tlog), con posiciones y velocidades a 5 Hz
+- mosaico GeoTIFF de 4 bandas (odm_orthophoto.tif) y modelo de elevación (dsm.tif) del tamaño indicado (requieren GDAL)
+
+Los archivos son siempre iguales para los mismos parámetros (los valores aleatorios usan una semilla fija)
+
+Uso:
+    python benchmarks/generar_vuelo.py CARPETA [--imagenes N] [--tamanio-mosaico PIXELS] [--tamanio-imagenes PIXELS]
+'''
+
+import argparse
+import datetime
+import math
+import os
+import struct
+
+import numpy as np
+from PIL import Image, TiffImagePlugin
+
+try:
+    from osgeo import gdal, osr
+except ImportError:
+    gdal = None
+
+# esquina noroeste del área relevada, distancia entre imágenes y altitud del punto de despegue
+LATITUD_INICIAL = -37.5
+LONGITUD_INICIAL = -60.2
+DISTANCIA_ENTRE_IMAGENES = 20   # metros
+ALTITUD_DESPEGUE = 100          # metros sobre el nivel del mar
+ALTITUD_DE_VUELO = 40           # metros sobre el punto de despegue
+VELOCIDAD_DE_VUELO = 5          # metros por segundo
+INICIO_VUELO = datetime.datetime(2022, 3, 5, 10, 0, 0)
+
+METROS_POR_GRADO_LATITUD = 111320
+
+
+def recorrido(imagenes):
+    # posición (latitud, longitud) de cada imagen, recorriendo el área en líneas paralelas de este a oeste y de oeste a este
+    columnas = max(1, math.ceil(math.sqrt(imagenes)))
+    paso_latitud = DISTANCIA_ENTRE_IMAGENES / METROS_POR_GRADO_LATITUD
+    paso_longitud = paso_latitud / math.cos(math.radians(LATITUD_INICIAL))
+    posiciones = []
+    for i in range(imagenes):
+        fila, columna = divmod(i, columnas)
+        if fila % 2 == 1: columna = columnas - 1 - columna
+        posiciones.append((LATITUD_INICIAL - fila * paso_latitud, LONGITUD_INICIAL + columna * paso_longitud))
+    return np.array(posiciones).reshape(-1, 2), columnas
+
+
+def grados_minutos_segundos(valor):
+    # coordenada en el formato de las etiquetas GPS de EXIF (tres números racionales)
+    valor = abs(valor)
+    grados = int(valor)
+    minutos = int((valor - grados) * 60)
+    segundos = (valor - grados - minutos / 60) * 3600
+    return (TiffImagePlugin.IFDRational(grados, 1), TiffImagePlugin.IFDRational(minutos, 1), TiffImagePlugin.IFDRational(round(segundos * 10000), 10000))
+
+
+def escribir_imagenes(carpeta, posiciones, tamanio, generador):
+    ancho, alto = tamanio, tamanio * 3 // 4
+    for i, (latitud, longitud) in enumerate(posiciones):
+        exif = Image.Exif()
+        exif[0x010F] = 'DJI'
+        exif[0x0110] = 'FC330'
+        datos_exif = exif.get_ifd(0x8769)
+        datos_exif[0x9003] = (INICIO_VUELO + datetime.timedelta(seconds=60 + i * DISTANCIA_ENTRE_IMAGENES / VELOCIDAD_DE_VUELO)).strftime('%Y:%m:%d %H:%M:%S')
+        datos_exif[0x829A] = TiffImagePlugin.IFDRational(1, 500)
+        datos_exif[0x8827] = 100
+        datos_gps = exif.get_ifd(0x8825)
+        datos_gps[0x0001] = 'S' if latitud < 0 else 'N'
+        datos_gps[0x0002] = grados_minutos_segundos(latitud)
+        datos_gps[0x0003] = 'W' if longitud < 0 else 'E'
+        datos_gps[0x0004] = grados_minutos_segundos(longitud)
+        datos_gps[0x0006] = TiffImagePlugin.IFDRational(round((ALTITUD_DESPEGUE + ALTITUD_DE_VUELO) * 10), 10)
+        # imagen con ruido, para que el tamaño del jpg se parezca al de una foto real
+        pixels = generador.integers(0, 256, (alto, ancho, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(os.path.join(carpeta, 'imagenes', 'DJI_%04d.JPG' % (i + 1)), quality=85, exif=exif)
+
+
+def escribir_plan_de_vuelo(ruta, posiciones, columnas):
+    # punto de despegue, cambio de velocidad, y un punto al comienzo y al final de cada línea del relevamiento
+    lineas = ['QGC WPL 110']
+    lineas.append('0\t1\t0\t16\t0\t0\t0\t0\t%.8f\t%.8f\t%.2f\t1' % (posiciones[0][0], posiciones[0][1], ALTITUD_DESPEGUE))
+    lineas.append('1\t0\t3\t178\t0\t%.1f\t0\t0\t0\t0\t0\t1' % VELOCIDAD_DE_VUELO)
+    extremos = [posiciones[i] for i in range(len(posiciones)) if i % columnas in (0, columnas - 1) or i == len(posiciones) - 1]
+    for indice, (latitud, longitud) in enumerate(extremos, start=2):
+        lineas.append('%d\t0\t3\t16\t0\t0\t0\t0\t%.8f\t%.8f\t%.2f\t1' % (indice, latitud, longitud, ALTITUD_DE_VUELO))
+    with open(ruta, 'w') as archivo:
+        archivo.write('\n'.join(lineas) + '\n')
+
+
+def extension(posiciones, margen=0.0005):
+    # latitud y longitud mínimas y máximas del área relevada, con un margen alrededor de las imágenes
+    return (posiciones[:, 0].min() - margen, posiciones[:, 0].max() + margen, posiciones[:, 1].min() - margen, posiciones[:, 1].max() + margen)
+
+
+def escribir_poligono(ruta, posiciones):
+    latitud_minima, latitud_maxima, longitud_minima, longitud_maxima = extension(posiciones)
+    with open(ruta, 'w') as archivo:
+        archivo.write('#saved by Mission Planner\n')
+        for latitud, longitud in [(latitud_maxima, longitud_minima), (latitud_minima, longitud_minima), (latitud_minima, longitud_maxima), (latitud_maxima, longitud_maxima)]:
+            archivo.write('%.8f %.8f\n' % (latitud, longitud))
+
+
+def crc_mavlink(datos, crc_extra):
+    crc = 0xFFFF
+    for byte in bytes(datos) + bytes([crc_extra]):
+        tmp = byte ^ (crc & 0xFF)
+        tmp ^= (tmp << 4) & 0xFF
+        crc = ((crc >> 8) ^ (tmp << 8) ^ (tmp << 3) ^ (tmp >> 4)) & 0xFFFF
+    return crc
+
+
+def mensaje_mavlink(secuencia, id_mensaje, crc_extra, payload):
+    # mensaje MAVLink 1: inicio, largo, secuencia, sistema, componente, id, payload y CRC
+    datos = bytes([len(payload), secuencia % 256, 1, 1, id_mensaje]) + payload
+    return b'\xfe' + datos + struct.pack('<H', crc_mavlink(datos, crc_extra))
+
+
+def escribir_telemetria(ruta, posiciones):
+    # posiciones cada 0.2 segundos, interpolando entre las imágenes, con un minuto en tierra antes del despegue y después del aterrizaje
+    segundos_entre_imagenes = DISTANCIA_ENTRE_IMAGENES / VELOCIDAD_DE_VUELO
+    tiempos = np.arange(0, 120 + max(1, len(posiciones) - 1) * segundos_entre_imagenes, 0.2)
+    tiempos_imagenes = 60 + np.arange(len(posiciones)) * segundos_entre_imagenes
+    latitudes = np.interp(tiempos, tiempos_imagenes, posiciones[:, 0])
+    longitudes = np.interp(tiempos, tiempos_imagenes, posiciones[:, 1])
+    en_vuelo = (tiempos >= 60) & (tiempos <= tiempos_imagenes[-1])
+    inicio = INICIO_VUELO.timestamp()
+    with open(ruta, 'wb') as archivo:
+        for i, tiempo in enumerate(tiempos):
+            altitud_relativa = ALTITUD_DE_VUELO if en_vuelo[i] else 0
+            velocidad = VELOCIDAD_DE_VUELO if en_vuelo[i] else 0
+            marca = struct.pack('>Q', int((inicio + tiempo) * 1e6))
+            # GLOBAL_POSITION_INT (id 33) y VFR_HUD (id 74)
+            posicion = struct.pack('<IiiiihhhH', int(tiempo * 1000), int(latitudes[i] * 1e7), int(longitudes[i] * 1e7),
+                                   int((ALTITUD_DESPEGUE + altitud_relativa) * 1000), int(altitud_relativa * 1000), velocidad * 100, 0, 0, 9000)
+            archivo.write(marca + mensaje_mavlink(2 * i, 33, 104, posicion))
+            hud = struct.pack('<ffffhH', velocidad, velocidad, ALTITUD_DESPEGUE + altitud_relativa, 0, 90, 50 if en_vuelo[i] else 0)
+            archivo.write(marca + mensaje_mavlink(2 * i + 1, 74, 20, hud))
+
+
+def escribir_geotiff(ruta, posiciones, tamanio, bandas, tipo_datos, generador, valor_sin_datos=None):
+    latitud_minima, latitud_maxima, longitud_minima, longitud_maxima = extension(posiciones)
+    ancho = tamanio
+    alto = max(1, int(round(tamanio * (latitud_maxima - latitud_minima) / (longitud_maxima - longitud_minima))))
+    controlador = gdal.GetDriverByName('GTiff')
+    opciones = ['TILED=YES', 'COMPRESS=DEFLATE', 'BIGTIFF=IF_SAFER']
+    if bandas == 4: opciones += ['PHOTOMETRIC=RGB', 'ALPHA=YES']
+    datos = controlador.Create(ruta, ancho, alto, bandas, tipo_datos, options=opciones)
+    datos.SetGeoTransform((longitud_minima, (longitud_maxima - longitud_minima) / ancho, 0, latitud_maxima, 0, -(latitud_maxima - latitud_minima) / alto))
+    referencia = osr.SpatialReference()
+    referencia.ImportFromEPSG(4326)
+    datos.SetProjection(referencia.ExportToWkt())
+    # escribir por bloques de filas, para no tener todo el mosaico en memoria
+    x = np.linspace(0, 1, ancho)
+    for fila in range(0, alto, 512):
+        filas = min(512, alto - fila)
+        y = np.linspace(fila / alto, (fila + filas) / alto, filas)[:, None]
+        for banda in range(1, bandas + 1):
+            if valor_sin_datos is not None:
+                valores = ALTITUD_DESPEGUE + 5 * np.sin(6 * x) * np.cos(4 * y) + generador.normal(0, 0.1, (filas, ancho))
+            elif banda == 4:
+                valores = np.full((filas, ancho), 255)
+            else:
+                valores = 128 + 60 * np.sin(8 * x + 3 * banda) * np.cos(5 * y) + generador.integers(-20, 20, (filas, ancho))
+            datos.GetRasterBand(banda).WriteArray(valores, 0, fila)
+    if valor_sin_datos is not None:
+        datos.GetRasterBand(1).SetNoDataValue(valor_sin_datos)
+    # vistas generales (overviews), como las que crea OpenDroneMap
+    niveles = [2 ** i for i in range(1, 8) if tamanio // 2 ** i >= 256]
+    if niveles:
+        datos.BuildOverviews('AVERAGE', niveles)
+    datos.FlushCache()
+    datos = None
+
+
+def generar_vuelo(carpeta, imagenes=100, tamanio_mosaico=2000, tamanio_imagenes=400, semilla=0):
+    '''
+    Crea una carpeta de vuelo sintética
+
+    Parameters
+    ----------
+    carpeta : str
+        Carpeta donde se crean los archivos (se crea si no existe)
+    imagenes : int, default=100
+        Cantidad de imágenes (también define el tamaño del área, el plan de vuelo y la duración de la telemetría)
+    tamanio_mosaico : int, default=2000
+        Ancho en pixels del mosaico y del modelo de elevación (0 para no crearlos)
+    tamanio_imagenes : int, default=400
+        Ancho en pixels de las imágenes
+    semilla : int, default=0
+        Semilla de los valores aleatorios
+
+    Returns
+    -------
+    archivos
+        dict con la cantidad de archivos creados de cada tipo
+    '''
+    generador = np.random.default_rng(semilla)
+    os.makedirs(os.path.join(carpeta, 'imagenes'), exist_ok=True)
+    posiciones, columnas = recorrido(imagenes)
+    escribir_imagenes(carpeta, posiciones, tamanio_imagenes, generador)
+    escribir_plan_de_vuelo(os.path.join(carpeta, 'plan.waypoints'), posiciones, columnas)
+    escribir_poligono(os.path.join(carpeta, 'area.poly'), posiciones)
+    escribir_telemetria(os.path.join(carpeta, INICIO_VUELO.strftime('%Y-%m-%d %H-%M-%S') + '.tlog'), posiciones)
+    archivos = {'imagen': imagenes, 'plan de vuelo': 1, 'polígono': 1, 'telemetría': 1, 'mosaico / dem': 0}
+    if tamanio_mosaico > 0:
+        if gdal is None:
+            print('GDAL no está instalado: no se crean el mosaico ni el modelo de elevación')
+        else:
+            os.makedirs(os.path.join(carpeta, 'odm'), exist_ok=True)
+            escribir_geotiff(os.path.join(carpeta, 'odm', 'odm_orthophoto.tif'), posiciones, tamanio_mosaico, 4, gdal.GDT_Byte, generador)
+            escribir_geotiff(os.path.join(carpeta, 'odm', 'dsm.tif'), posiciones, tamanio_mosaico, 1, gdal.GDT_Float32, generador, valor_sin_datos=-9999)
+            archivos['mosaico / dem'] = 2
+    return archivos
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Crea una carpeta de vuelo sintética para las pruebas de rendimiento')
+    parser.add_argument('carpeta')
+    parser.add_argument('--imagenes', type=int, default=100)
+    parser.add_argument('--tamanio-mosaico', type=int, default=2000)
+    parser.add_argument('--tamanio-imagenes', type=int, default=400)
+    parser.add_argument('--semilla', type=int, default=0)
+    argumentos = parser.parse_args()
+    print(generar_vuelo(argumentos.carpeta, argumentos.imagenes, argumentos.tamanio_mosaico, argumentos.tamanio_imagenes, argumentos.semilla))
@@ -0,0 +1,182 @@
+'''
+Pruebas de rendimiento de Bitácora
+
+Genera carpetas de vuelo sintéticas de distintos tamaños (ver generar_vuelo.py) y mide, para cada una, el tiempo y
+la memoria máxima de los pasos de "Nuevo vuelo": importar, actualizar_datos, crear_mapa, guardar_kml y guardar_csv.
+
+Cada paso se repite varias veces partiendo siempre del mismo estado (lo que se necesita para llegar a ese estado no
+se mide). La primera vez que se mide cada paso se hace antes una repetición sin medir, para que no se incluya lo que
+se hace una sola vez por proceso (importar módulos, crear el índice de localidades). La memoria se mide en una
+repetición adicional con tracemalloc (que hace más lento el código y sólo registra la memoria reservada a través de
+Python, no la de GDAL). La memoria caché del usuario se reemplaza por una carpeta temporal vacía, y la de mosaicos
+se vacía antes de cada repetición de crear_mapa.
+
+Los resultados se guardan en un archivo json, que se puede comparar luego con los de otra versión:
+    python benchmarks/rendimiento.py --salida antes.json
+    python benchmarks/rendimiento.py --salida despues.json --comparar antes.json
+
+Uso:
+    python benchmarks/rendimiento.py [--escalas 10,100,1000] [--repeticiones N] [--tamanio-mosaico PIXELS]
+                                     [--salida ARCHIVO] [--comparar ARCHIVO] [--tolerancia 0.2]
+'''
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+carpeta_programa = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, carpeta_programa)
+
+from generar_vuelo import generar_vuelo
+
+
+def vuelo_importado(bitacora, carpeta):
+    vuelo = bitacora.Vuelo(carpeta=carpeta)
+    vuelo.importar(carpeta)
+    return vuelo
+
+
+def vuelo_actualizado(bitacora, carpeta):
+    vuelo = vuelo_importado(bitacora, carpeta)
+    vuelo.actualizar_datos()
+    return vuelo
+
+
+def vuelo_con_mapa(bitacora, carpeta):
+    vuelo = vuelo_actualizado(bitacora, carpeta)
+    vuelo.crear_mapa(tamanio=8, calidad='exportar')
+    return vuelo
+
+
+def vaciar_cache_mosaicos(bitacora):
+    shutil.rmtree(bitacora.carpeta_cache('mosaicos'), ignore_errors=True)
+
+
+# pasos a medir: nombre, preparación (devuelve el estado inicial, sin medir) y paso medido
+PRUEBAS = [
+    ('importar',         lambda bitacora, carpeta: bitacora.Vuelo(carpeta=carpeta), lambda vuelo: vuelo.importar(vuelo.carpeta)),
+    ('actualizar_datos', vuelo_importado,                                           lambda vuelo: vuelo.actualizar_datos()),
+    ('crear_mapa',       vuelo_actualizado,                                         lambda vuelo: vuelo.crear_mapa(tamanio=8, calidad='exportar')),
+    ('guardar_kml',      vuelo_actualizado,                                         lambda vuelo: vuelo.guardar_kml()),
+    ('guardar_csv',      vuelo_con_mapa,                                            lambda vuelo: vuelo.guardar_csv()),
+]
+
+
+def medir(bitacora, carpeta, preparar, ejecutar, repeticiones, vaciar_cache=False, calentar=False):
+    '''
+    Mide el tiempo de cada repetición de un paso, y la memoria máxima en una repetición adicional
+
+    Returns
+    -------
+    resultado
+        dict con los tiempos en segundos (segundos, mediana, minimo) y la memoria máxima en MB (memoria_mb)
+    '''
+    tiempos = []
+    for repeticion in range(-1 if calentar else 0, repeticiones + 1):
+        # no mostrar el listado de archivos importados
+        with contextlib.redirect_stdout(io.StringIO()):
+            estado = preparar(bitacora, carpeta)
+            if vaciar_cache: vaciar_cache_mosaicos(bitacora)
+            if repeticion < 0:
+                ejecutar(estado)
+            elif repeticion < repeticiones:
+                inicio = time.perf_counter()
+                ejecutar(estado)
+                tiempos.append(time.perf_counter() - inicio)
+            else:
+                tracemalloc.start()
+                ejecutar(estado)
+                memoria_maxima = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+    return {
+        'segundos': tiempos,
+        'mediana': statistics.median(tiempos),
+        'minimo': min(tiempos),
+        'memoria_mb': memoria_maxima / 1024 / 1024,
+    }
+
+
+def comparar(resultados, anteriores, tolerancia):
+    # mostrar la relación entre las medianas de cada prueba, y devolver la cantidad de pruebas más lentas que la tolerancia
+    medianas_anteriores = {(r['imagenes'], r['prueba']): r['mediana'] for r in anteriores['resultados']}
+    mas_lentas = 0
+    print()
+    print('Comparación con ' + anteriores['fecha'] + ' (versión ' + str(anteriores['version_bitacora']) + ')')
+    for resultado in resultados:
+        anterior = medianas_anteriores.get((resultado['imagenes'], resultado['prueba']))
+        if anterior is None:
+            continue
+        relacion = resultado['mediana'] / anterior if anterior > 0 else float('inf')
+        aviso = ''
+        if relacion > 1 + tolerancia:
+            aviso = '  <- más lento'
+            mas_lentas += 1
+        elif relacion < 1 - tolerancia:
+            aviso = '  <- más rápido'
+        print('{:>7} imágenes  {:<18} {:8.3f} s -> {:8.3f} s  x{:5.2f}{}'.format(resultado['imagenes'], resultado['prueba'], anterior, resultado['mediana'], relacion, aviso))
+    return mas_lentas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mide el rendimiento de Bitácora con carpetas de vuelo sintéticas')
+    parser.add_argument('--escalas', default='10,100,1000', help='cantidades de imágenes de las carpetas de vuelo, separadas por comas')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--tamanio-mosaico', type=int, default=2000, help='ancho en pixels del mosaico y del modelo de elevación (0: sin mosaico)')
+    parser.add_argument('--carpeta', help='carpeta donde se crean los vuelos sintéticos (por defecto, una carpeta temporal que se borra al terminar)')
+    parser.add_argument('--salida', default='rendimiento.json', help='archivo json donde se guardan los resultados')
+    parser.add_argument('--comparar', help='archivo json con resultados anteriores')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='diferencia relativa a partir de la cual una prueba se considera más lenta')
+    argumentos = parser.parse_args()
+
+    carpeta_temporal = tempfile.mkdtemp(prefix='bitacora_rendimiento_')
+    carpeta_vuelos = argumentos.carpeta or os.path.join(carpeta_temporal, 'vuelos')
+    # memoria caché vacía, para que no influyan los archivos de ejecuciones anteriores (se define antes de importar bitacora)
+    os.environ['LOCALAPPDATA'] = os.environ['XDG_CACHE_HOME'] = os.path.join(carpeta_temporal, 'cache')
+    import bitacora
+
+    resultados = []
+    pruebas_calentadas = set()
+    try:
+        for imagenes in [int(escala) for escala in argumentos.escalas.split(',')]:
+            carpeta = os.path.join(carpeta_vuelos, 'vuelo_%d' % imagenes)
+            if not os.path.isdir(carpeta):
+                print('Generando vuelo con %d imágenes...' % imagenes)
+                generar_vuelo(carpeta, imagenes=imagenes, tamanio_mosaico=argumentos.tamanio_mosaico)
+            for prueba, preparar, ejecutar in PRUEBAS:
+                resultado = medir(bitacora, carpeta, preparar, ejecutar, argumentos.repeticiones, vaciar_cache=(prueba == 'crear_mapa'), calentar=(prueba not in pruebas_calentadas))
+                pruebas_calentadas.add(prueba)
+                resultado = dict(imagenes=imagenes, prueba=prueba, **resultado)
+                resultados.append(resultado)
+                print('{:>7} imágenes  {:<18} mediana {:8.3f} s   mínimo {:8.3f} s   memoria {:8.1f} MB'.format(
+                    imagenes, prueba, resultado['mediana'], resultado['minimo'], resultado['memoria_mb']))
+    finally:
+        shutil.rmtree(carpeta_temporal, ignore_errors=True)
+
+    salida = {
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'version_bitacora': bitacora.version_bitacora,
+        'python': platform.python_version(),
+        'sistema': platform.platform(),
+        'procesador': platform.processor() or platform.machine(),
+        'nucleos': os.cpu_count(),
+        'parametros': {'repeticiones': argumentos.repeticiones, 'tamanio_mosaico': argumentos.tamanio_mosaico},
+        'resultados': resultados,
+    }
+    with open(argumentos.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(salida, archivo, indent=2, ensure_ascii=False)
+    print('Resultados guardados en ' + argumentos.salida)
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding='utf-8') as archivo:
+            anteriores = json.load(archivo)
+        sys.exit(1 if comparar(resultados, anteriores, argumentos.tolerancia) > 0 else 0)
@@ -0,0 +1,96 @@
+'''
+Tiempo de inicio de Bitácora
+
+Mide (en procesos nuevos, para que no influya lo que ya está importado):
+- el tiempo de importar bitacora.py como módulo (sin interfaz gráfica)
+- el tiempo hasta que se muestra la ventana principal (requiere una pantalla)
+
+La ventana principal se abre con una carpeta de usuario temporal (con los archivos del programa ya copiados y el idioma 
+ya elegido, para que no se pida), de modo que no se usan ni se modifican los archivos del usuario. 
+Cada ejecución que no termina en el tiempo máximo se cuenta como fallida.
+
+Uso:
+    python benchmarks/tiempo_de_inicio.py [--repeticiones N] [--tiempo-maximo SEGUNDOS]
+'''
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+carpeta_programa = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ruta_programa = os.path.join(carpeta_programa, 'bitacora.py')
+
+# ejecuta bitacora.py como programa principal, reemplazando el bucle de eventos de la ventana principal 
+# para que el programa termine apenas se dibuja la ventana (sin win32com, para que la carpeta "Documentos" 
+# sea la de la carpeta de usuario indicada en las variables de entorno)
+PRIMERA_VENTANA = '''
+import runpy, sys, tkinter
+sys.modules['win32com'] = None
+def cerrar(ventana, n=0):
+    ventana.update()
+    ventana.destroy()
+    sys.exit(0)
+tkinter.Tk.mainloop = cerrar
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name='__main__')
+'''
+
+
+def preparar_usuario_temporal(carpeta):
+    # carpeta de usuario con los archivos del programa en "Documentos" y el idioma ya elegido, 
+    # y variables de entorno para usarla como carpeta de usuario (y como memoria caché)
+    carpeta_archivos = os.path.join(carpeta, 'Documents', 'bitacora_archivos')
+    os.makedirs(carpeta_archivos)
+    for archivo in ('bitacora.ini', 'vuelos.csv', 'textos_interfaz.xlsx'):
+        shutil.copy2(os.path.join(carpeta_programa, 'bitacora_archivos', archivo), carpeta_archivos)
+    ruta_inicio = os.path.join(carpeta_archivos, 'bitacora.ini')
+    with open(ruta_inicio) as archivo:
+        inicio = archivo.read()
+    with open(ruta_inicio, 'w') as archivo:
+        archivo.write(inicio.replace('idioma,-', 'idioma,es'))
+    return dict(os.environ, HOME=carpeta, USERPROFILE=carpeta, LOCALAPPDATA=os.path.join(carpeta, 'cache'), XDG_CACHE_HOME=os.path.join(carpeta, 'cache'))
+
+
+def medir(comando, repeticiones, entorno=None, tiempo_maximo=None):
+    # ejecutar el comando varias veces y devolver los tiempos en segundos (o None si falla o no termina en el tiempo máximo)
+    tiempos = []
+    for i in range(repeticiones):
+        inicio = time.perf_counter()
+        try:
+            resultado = subprocess.run(comando, cwd=carpeta_programa, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=tiempo_maximo)
+        except subprocess.TimeoutExpired:
+            print('no terminó en ' + str(tiempo_maximo) + ' s')
+            return None
+        if resultado.returncode != 0:
+            print(resultado.stderr.decode(errors='replace').strip().splitlines()[-1])
+            return None
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def mostrar(nombre, tiempos):
+    if tiempos is None:
+        print('{:<28} no se pudo medir'.format(nombre))
+    else:
+        print('{:<28} mediana {:7.3f} s   mínimo {:7.3f} s'.format(nombre, statistics.median(tiempos), min(tiempos)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mide el tiempo de inicio de Bitácora')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--tiempo-maximo', type=float, default=60, help='segundos que se espera cada ejecución antes de considerarla fallida')
+    argumentos = parser.parse_args()
+
+    mostrar('intérprete', medir([sys.executable, '-c', 'pass'], argumentos.repeticiones, tiempo_maximo=argumentos.tiempo_maximo))
+    mostrar('importar bitacora', medir([sys.executable, '-c', 'import bitacora'], argumentos.repeticiones, tiempo_maximo=argumentos.tiempo_maximo))
+    carpeta_usuario = tempfile.mkdtemp(prefix='bitacora_inicio_')
+    try:
+        entorno = preparar_usuario_temporal(carpeta_usuario)
+        mostrar('primera ventana', medir([sys.executable, '-c', PRIMERA_VENTANA, ruta_programa], argumentos.repeticiones, entorno, argumentos.tiempo_maximo))
+    finally:
+        shutil.rmtree(carpeta_usuario, ignore_errors=True)
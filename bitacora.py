@@ -1,54 +1,77 @@
 ###############
 # DEPENDENCIAS
+# (las librerías más pesadas se importan recién cuando se usan, para que el programa abra más rápido;
+#  tkinter y win32com se importan sólo en la interfaz gráfica, para poder usar Vuelo sin ellas)
 
-# tkinter para interfaz gráfica
-from ensurepip import version
-import tkinter
-from tkinter import ttk
-import tkinter.simpledialog
-from tkinter.filedialog import askdirectory
 import inspect
 
 # os para manipular archivos
 import os
+import sys
 import datetime
+import time
+import struct
+import hashlib
+import json
+import re
+import math
+import sqlite3
+import csv
+import warnings
+import importlib
+import importlib.util
+from typing import TYPE_CHECKING
+
+# para procesar vuelos desde la línea de comandos
+import argparse
+
+# para leer los archivos en procesos paralelos
+import concurrent.futures
+import multiprocessing
+
+# para leer los archivos de un vuelo en segundo plano sin bloquear la interfaz gráfica
+import threading
+import queue
 
 # pandas para tablas
 import pandas as pd
-
-# geopandas y shapely para tablas con datos geográficos
-import geopandas as gpd
-from shapely.geometry import Point, LineString, Polygon
-from shapely.wkt import loads
-
-# matplotlib para graficar
-import matplotlib.pyplot as plt
-# usar un 'backend' apropiado para crear el mapa en formato png 
-import matplotlib
-matplotlib.use('Agg')
+import numpy as np
 
 # pillow para imágenes
-from PIL import ImageTk,Image
+from PIL import Image, ImageOps
 
-# para procesar archivos kmz
-from zipfile import ZipFile
-from lxml import html
+# para crear archivos kmz
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+import itertools
 
-# para leer datos exif
-import exif
 
-# para buscar los nombres de las ciudades por coordenadas
-import reverse_geocoder
+class ModuloDiferido:
+    # módulo que se importa la primera vez que se usa alguno de sus atributos
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
 
-# para abrir y mostrar mosaicos geotiff
-from osgeo import gdal
-import numpy as np
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nombre)
+        return getattr(self._modulo, atributo)
 
-# para abrir carpetas de archivos
-import webbrowser
 
-# para averiguar la ubicación de la carpeta Documentos en Windows
-from win32com.shell import shell, shellcon
+# geopandas y shapely para tablas con datos geográficos
+gpd = ModuloDiferido('geopandas')
+geometria = ModuloDiferido('shapely.geometry')
+wkb = ModuloDiferido('shapely.wkb')
+if TYPE_CHECKING:
+    # no se ejecuta, pero permite que PyInstaller encuentre los módulos diferidos al crear el ejecutable
+    import geopandas
+    import shapely.geometry, shapely.wkb
+    # reverse_geocoder no se importa (sólo se usa su archivo de ciudades, ver abrir_indice_localidades), 
+    # pero tiene que incluirse en el ejecutable junto con sus archivos de datos (ver hook-reverse_geocoder.py)
+    import reverse_geocoder
+
+# matplotlib para graficar (se importa en crear_mapa)
+# gdal para abrir y mostrar mosaicos geotiff (se importa en leer_mosaico)
+# exif para leer datos exif de imágenes con encabezados no reconocidos (se importa en leer_datos_imagen)
 
 # para copiar archivos
 import shutil
@@ -58,7 +81,788 @@ import shutil
 global version_bitacora
 version_bitacora = 0.6
 
+# versión del formato del manifiesto de archivos de cada vuelo (cambiarla si cambian los datos que se extraen de los archivos)
+VERSION_MANIFIESTO = 2
+
+###################
+# LECTURA DE ARCHIVOS
+# (funciones independientes de la clase Vuelo, para poder ejecutarlas en procesos paralelos)
+
+
+# etiquetas EXIF que utiliza Bitácora, según el IFD (directorio) en el que se encuentran
+ETIQUETAS_EXIF = {
+    'ifd0': {0x010F: 'make', 0x0110: 'model', 0x8769: 'exif_ifd', 0x8825: 'gps_ifd'},
+    'exif': {0x9003: 'datetime_original', 0x829A: 'exposure_time', 0x8827: 'photographic_sensitivity'},
+    'gps':  {0x0001: 'gps_latitude_ref', 0x0002: 'gps_latitude', 0x0003: 'gps_longitude_ref', 0x0004: 'gps_longitude', 0x0006: 'gps_altitude'},
+}
+
+# tamaño en bytes de cada tipo de dato TIFF: 1 BYTE, 2 ASCII, 3 SHORT, 4 LONG, 5 RATIONAL, 7 UNDEFINED, 9 SLONG, 10 SRATIONAL
+TAMANIOS_TIPOS_TIFF = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+
+def leer_exif_jpeg(ruta_archivo):
+    '''
+    Lee sólo el encabezado de una imagen jpg (hasta el inicio de los datos de la imagen) y decodifica las etiquetas EXIF que utiliza Bitácora
+
+    Parameters
+    ----------
+    ruta_archivo : str
+        Ruta completa de la imagen
+
+    Returns
+    -------
+    etiquetas
+        dict con los valores de las etiquetas (con los mismos nombres que usa la librería exif), 
+        dict vacío si la imagen no tiene datos EXIF, o None si el encabezado tiene un formato no reconocido
+    '''
+    try:
+        with open(ruta_archivo, 'rb') as archivo:
+            if archivo.read(2) != b'\xff\xd8':
+                return None
+            while True:
+                # cada segmento comienza con 0xFF y el código del segmento (antes del código puede haber más bytes 0xFF de relleno)
+                if archivo.read(1) != b'\xff':
+                    return None
+                codigo = archivo.read(1)
+                while codigo == b'\xff':
+                    codigo = archivo.read(1)
+                if len(codigo) == 0:
+                    return None
+                codigo = codigo[0]
+                # inicio de los datos de la imagen (SOS) o fin de la imagen (EOI): no hay datos EXIF
+                if codigo in (0xDA, 0xD9):
+                    return {}
+                # segmentos sin datos
+                if codigo == 0x01 or 0xD0 <= codigo <= 0xD7:
+                    continue
+                longitud = struct.unpack('>H', archivo.read(2))[0] - 2
+                if codigo == 0xE1:
+                    segmento = archivo.read(longitud)
+                    if segmento.startswith(b'Exif\x00\x00'):
+                        return decodificar_tiff(segmento[6:])
+                else:
+                    archivo.seek(longitud, os.SEEK_CUR)
+    except (struct.error, ValueError, IndexError, ZeroDivisionError, UnicodeDecodeError):
+        return None
+
+
+def decodificar_tiff(datos):
+    # orden de los bytes del bloque TIFF del segmento EXIF
+    if datos[:2] == b'II': orden = '<'
+    elif datos[:2] == b'MM': orden = '>'
+    else: raise ValueError('Encabezado TIFF no reconocido')
+    if struct.unpack(orden + 'H', datos[2:4])[0] != 42:
+        raise ValueError('Encabezado TIFF no reconocido')
+    etiquetas = {}
+    inicio_ifd0 = struct.unpack(orden + 'I', datos[4:8])[0]
+    etiquetas.update(decodificar_ifd(datos, orden, inicio_ifd0, ETIQUETAS_EXIF['ifd0']))
+    exif_ifd = etiquetas.pop('exif_ifd', None)
+    gps_ifd = etiquetas.pop('gps_ifd', None)
+    if exif_ifd is not None:
+        etiquetas.update(decodificar_ifd(datos, orden, exif_ifd, ETIQUETAS_EXIF['exif']))
+    if gps_ifd is not None:
+        etiquetas.update(decodificar_ifd(datos, orden, gps_ifd, ETIQUETAS_EXIF['gps']))
+    return etiquetas
+
+
+def decodificar_ifd(datos, orden, inicio, etiquetas_buscadas):
+    etiquetas = {}
+    cantidad_entradas = struct.unpack(orden + 'H', datos[inicio:inicio+2])[0]
+    for i in range(cantidad_entradas):
+        # cada entrada tiene 12 bytes: etiqueta, tipo, cantidad de valores, y valor (o posición del valor si no entra en 4 bytes)
+        entrada = inicio + 2 + i * 12
+        etiqueta, tipo, cantidad = struct.unpack(orden + 'HHI', datos[entrada:entrada+8])
+        if etiqueta not in etiquetas_buscadas:
+            continue
+        if tipo not in TAMANIOS_TIPOS_TIFF:
+            raise ValueError('Tipo de dato TIFF no reconocido')
+        tamanio = TAMANIOS_TIPOS_TIFF[tipo] * cantidad
+        if tamanio <= 4:
+            posicion = entrada + 8
+        else:
+            posicion = struct.unpack(orden + 'I', datos[entrada+8:entrada+12])[0]
+        valor = datos[posicion:posicion+tamanio]
+        if len(valor) < tamanio:
+            raise ValueError('Etiqueta fuera del segmento EXIF')
+        if tipo == 2:
+            valor = valor.split(b'\x00')[0].decode('ascii')
+        elif tipo in (5, 10):
+            numeros = struct.unpack(orden + ('I' if tipo == 5 else 'i') * (2 * cantidad), valor)
+            valor = tuple(numeros[j] / numeros[j+1] for j in range(0, len(numeros), 2))
+        else:
+            formato = {1: 'B', 3: 'H', 4: 'I', 7: 'B', 9: 'i'}[tipo]
+            valor = struct.unpack(orden + formato * cantidad, valor)
+        # los valores únicos se devuelven como número, y los múltiples como tupla
+        if tipo != 2 and len(valor) == 1:
+            valor = valor[0]
+        etiquetas[etiquetas_buscadas[etiqueta]] = valor
+    return etiquetas
+
+
+def leer_datos_imagen(ruta_archivo):
+    '''
+    Lee los datos EXIF de una imagen
+
+    Parameters
+    ----------
+    ruta_archivo : str
+        Ruta completa de la imagen
+
+    Returns
+    -------
+    datos_imagen
+        dict con los datos a incorporar a la tabla de archivos (datetime, camara, exposicion, iso, latitud, longitud, altitud)
+    '''
+    datos_imagen = {}
+    # leer datos EXIF, leyendo sólo el encabezado de la imagen
+    imagen = leer_exif_jpeg(ruta_archivo)
+    # si el encabezado tiene un formato no reconocido, leer la imagen completa con la librería exif
+    if imagen is None:
+        import exif
+        with open(ruta_archivo, "rb") as archivo_imagen:
+            imagen = exif.Image(archivo_imagen)
+        if not imagen.has_exif:
+            return datos_imagen
+    elif len(imagen) == 0:
+        return datos_imagen
+    # obtener fecha y hora de captura de la imagen
+    datetime_original = imagen.get('datetime_original', pd.NA)
+    if pd.notna(datetime_original):
+        fecha, hora = datetime_original.split()
+        fecha = fecha.replace(':','-')
+        datos_imagen['datetime'] = pd.to_datetime(fecha + ' ' + hora)
+    # obtener datos de la cámara
+    marca = imagen.get('make', pd.NA)
+    modelo = imagen.get('model', pd.NA)
+    if pd.notna(marca) & pd.notna(modelo):
+        if modelo.startswith(marca): camara = modelo
+        else: camara = marca + ' - ' + modelo
+    else:
+        if pd.notna(marca): camara = marca
+        elif pd.notna(modelo): camara = modelo
+        else: camara = pd.NA
+    # velocidad de exposición
+    exposicion = imagen.get('exposure_time', pd.NA)
+    # sensibilidad ISO
+    iso_1 = imagen.get('iso_speed_ratings', pd.NA)
+    iso_2 = imagen.get('photographic_sensitivity', pd.NA)
+    if pd.notna(iso_1): iso = iso_1
+    elif pd.notna(iso_2): iso = iso_2
+    else: iso = pd.NA
+    datos_imagen['camara'] = camara
+    datos_imagen['exposicion'] = exposicion
+    datos_imagen['iso'] = iso
+    # obtener coordenadas GPS
+    latitud = imagen.get('gps_latitude', pd.NA)
+    if pd.notna(latitud):
+        latitud = coordenadas_decimales(latitud, imagen.get('gps_latitude_ref'))
+        longitud = coordenadas_decimales(imagen.get('gps_longitude'), imagen.get('gps_longitude_ref'))
+        altitud = imagen.get('gps_altitude', pd.NA)
+        datos_imagen['latitud'] = latitud
+        datos_imagen['longitud'] = longitud
+        datos_imagen['altitud'] = altitud
+    return datos_imagen
+
+
+def coordenadas_decimales(coordenadas, coordenadas_ref):
+    grados_decimales = coordenadas[0] + \
+                    coordenadas[1] / 60 + \
+                    coordenadas[2] / 3600
+    if coordenadas_ref == "S" or coordenadas_ref == "W":
+        grados_decimales = -grados_decimales
+    return grados_decimales
+
+
+def recorrer_carpeta(carpeta, extensiones=None):
+    '''
+    Recorre la carpeta y sus subcarpetas (en orden alfabético, sin recursión), devolviendo los archivos a medida que los encuentra
+
+    Parameters
+    ----------
+    carpeta : str
+        Ruta completa de la carpeta
+    extensiones : dict or list of str, optional
+        Extensiones de los archivos a devolver (se filtran antes de consultar el tamaño y la fecha de cada archivo), 
+        por defecto las de los tipos de archivo registrados en TIPOS_ARCHIVO
+
+    Yields
+    ------
+    ruta_archivo, tamanio, mtime
+        Ruta completa, tamaño en bytes y fecha de modificación (timestamp) de cada archivo
+    '''
+    if extensiones is None: extensiones = TIPOS_ARCHIVO
+    # pila con las entradas pendientes de cada carpeta abierta (la última es la subcarpeta que se está recorriendo)
+    pila = [iter(listar_entradas(carpeta))]
+    while pila:
+        entrada = next(pila[-1], None)
+        if entrada is None:
+            pila.pop()
+            continue
+        if entrada.is_dir():
+            pila.append(iter(listar_entradas(entrada.path)))
+            continue
+        if os.path.splitext(entrada.name)[1].lower() not in extensiones:
+            continue
+        if entrada.is_file():
+            # el resultado de stat queda guardado en la entrada (en Windows se obtiene junto con el listado de la carpeta)
+            estado = entrada.stat()
+            yield entrada.path, estado.st_size, estado.st_mtime
+
+
+def listar_entradas(carpeta):
+    with os.scandir(carpeta) as entradas:
+        return sorted(entradas, key=lambda entrada: entrada.name)
+
+
+def coordenadas_kml(coordenadas):
+    # coordenadas de una línea o polígono en formato kml (una línea 'longitud,latitud,0' por vértice, sin la altitud)
+    return ''.join('          ' + str(x) + ',' + str(y) + ',0\n' for x, y, *z in coordenadas)
+
+
+# comandos MAVLink de los planes de vuelo (.waypoints) y sistemas de referencia de la altitud de cada punto
+COMANDO_WAYPOINT = 16
+COMANDO_CAMBIO_DE_VELOCIDAD = 178
+MARCOS_ALTITUD_ABSOLUTA = [0, 5]
+# altitud sobre el terreno en cada punto (MAV_FRAME_GLOBAL_TERRAIN_ALT y su versión _INT): como no se conoce la altura del terreno, 
+# la altitud de esos puntos queda vacía (el resto de los marcos se toman como relativos al punto de inicio)
+MARCOS_ALTITUD_SOBRE_EL_TERRENO = [10, 11]
+
+
+def leer_archivo_waypoints(ruta_archivo):
+    '''
+    Lee un plan de vuelo en formato .waypoints (QGC WPL), convirtiendo todos los valores juntos a un array de NumPy (con numpy.loadtxt)
+
+    Parameters
+    ----------
+    ruta_archivo : str
+        Ruta completa del archivo
+
+    Returns
+    -------
+    recorrido, altitud_inicial, altitud_media, velocidad
+        Recorrido del plan de vuelo (LineString con longitud, latitud y altitud absoluta de cada punto, o None si tiene menos de dos puntos), 
+        altitud del punto de inicio, altitud absoluta media de los puntos (sin los puntos con altitud sobre el terreno, 
+        o pd.NA si todos la tienen), y velocidad de vuelo (o pd.NA si el plan no la modifica)
+    '''
+    # leer los 12 valores de cada línea (salvo el encabezado): índice, punto actual, marco de referencia, comando, 
+    # 4 parámetros, latitud, longitud, altitud y continuar automáticamente
+    tabla = leer_tabla_numerica(ruta_archivo, 'QGC', 12)
+    indices, marcos, comandos = tabla[:, 0], tabla[:, 2], tabla[:, 3]
+
+    # altitud del punto de inicio (índice 0, altitud absoluta)
+    inicio = tabla[(indices == 0) & (marcos == 0), 10]
+    altitud_inicial = float(inicio[-1]) if len(inicio) > 0 else 0
+    # velocidad del último cambio de velocidad (segundo parámetro)
+    velocidades = tabla[comandos == COMANDO_CAMBIO_DE_VELOCIDAD, 5]
+    velocidad = float(velocidades[-1]) if len(velocidades) > 0 else pd.NA
+
+    # puntos del recorrido, con la altitud absoluta
+    puntos = tabla[(comandos == COMANDO_WAYPOINT) & (indices != 0)]
+    altitudes = np.where(np.isin(puntos[:, 2], MARCOS_ALTITUD_ABSOLUTA), puntos[:, 10], puntos[:, 10] + altitud_inicial)
+    altitudes[np.isin(puntos[:, 2], MARCOS_ALTITUD_SOBRE_EL_TERRENO)] = np.nan
+    if len(puntos) == 0:
+        altitud_media = 0
+    else:
+        altitud_media = float(np.nanmean(altitudes)) if not np.isnan(altitudes).all() else pd.NA
+    recorrido = geometria.LineString(np.column_stack((puntos[:, 9], puntos[:, 8], altitudes))) if len(puntos) > 1 else None
+    return recorrido, altitud_inicial, altitud_media, velocidad
+
+
+def leer_tabla_numerica(ruta_archivo, comentarios, columnas):
+    # todos los valores de un archivo de texto, como array de NumPy con una fila por línea (sin las líneas que empiezan con el texto de los comentarios)
+    with warnings.catch_warnings():
+        # archivo sin datos
+        warnings.simplefilter('ignore', UserWarning)
+        tabla = np.loadtxt(ruta_archivo, comments=comentarios, ndmin=2)
+    return tabla if tabla.shape[1] == columnas else np.zeros((0, columnas))
+
+
+def leer_archivo_poly(ruta_archivo):
+    # polígono en formato .poly (una línea 'latitud longitud' por vértice), o None si tiene menos de tres vértices
+    vertices = leer_tabla_numerica(ruta_archivo, '#', 2)
+    return geometria.Polygon(vertices[:, ::-1]) if len(vertices) > 2 else None
+
+
+# mensajes MAVLink que se leen de los registros de telemetría (.tlog), según su id: nombre, largo del payload en MAVLink 1,
+# largo máximo del payload en MAVLink 2 (con las extensiones), byte extra del CRC, y campos en el orden en que se transmiten
+MENSAJES_MAVLINK = {
+    24: ('GPS_RAW_INT', 30, 52, 24, np.dtype([('time_usec', '<u8'), ('lat', '<i4'), ('lon', '<i4'), ('alt', '<i4'), ('eph', '<u2'), ('epv', '<u2'), ('vel', '<u2'), ('cog', '<u2'), ('fix_type', 'u1'), ('satellites_visible', 'u1')])),
+    33: ('GLOBAL_POSITION_INT', 28, 28, 104, np.dtype([('time_boot_ms', '<u4'), ('lat', '<i4'), ('lon', '<i4'), ('alt', '<i4'), ('relative_alt', '<i4'), ('vx', '<i2'), ('vy', '<i2'), ('vz', '<i2'), ('hdg', '<u2')])),
+    74: ('VFR_HUD', 20, 20, 20, np.dtype([('airspeed', '<f4'), ('groundspeed', '<f4'), ('alt', '<f4'), ('climb', '<f4'), ('heading', '<i2'), ('throttle', '<u2')])),
+}
+
+# cantidad de bytes del registro de telemetría que se analizan juntos (el archivo se recorre por bloques para limitar la memoria utilizada)
+TAMANIO_BLOQUE_TELEMETRIA = 16 * 1024 * 1024
+
+# altitud (en metros sobre el punto de despegue) a partir de la cual se considera que el dron está en vuelo
+ALTITUD_MINIMA_EN_VUELO = 1
+
+
+def crc_mavlink(datos, crc_extra):
+    # CRC X.25 de varios mensajes a la vez (una fila de bytes por mensaje, sin el byte de inicio), agregando al final el byte extra del tipo de mensaje
+    crc = np.full(len(datos), 0xFFFF, dtype=np.uint32)
+    for byte in list(datos.T.astype(np.uint32)) + [np.uint32(crc_extra)]:
+        tmp = (byte ^ crc) & 0xFF
+        tmp ^= (tmp << 4) & 0xFF
+        crc = ((crc >> 8) ^ (tmp << 8) ^ (tmp << 3) ^ (tmp >> 4)) & 0xFFFF
+    return crc
+
+
+def leer_telemetria(ruta_archivo, tamanio_bloque=TAMANIO_BLOQUE_TELEMETRIA):
+    '''
+    Lee los mensajes de posición y velocidad de un registro de telemetría MAVLink (.tlog), sin crear un objeto por mensaje
+
+    El archivo se abre como memoria mapeada y se recorre por bloques: en cada bloque se buscan todos los bytes de inicio 
+    de mensaje (0xFE en MAVLink 1, 0xFD en MAVLink 2) a la vez, y los mensajes de cada tipo y largo se validan con el CRC 
+    y se decodifican juntos, como arrays de NumPy
+
+    Parameters
+    ----------
+    ruta_archivo : str
+        Ruta completa del archivo .tlog
+    tamanio_bloque : int, optional
+        Cantidad de bytes del archivo que se analizan juntos
+
+    Returns
+    -------
+    mensajes
+        dict con el nombre de cada tipo de mensaje (GLOBAL_POSITION_INT, GPS_RAW_INT, VFR_HUD) como clave, y como valor un 
+        array estructurado con los campos del mensaje y el campo 'tiempo' (datetime64 UTC con el que se registró el mensaje), 
+        en el orden del archivo
+    '''
+    try:
+        datos = np.asarray(np.memmap(ruta_archivo, dtype=np.uint8, mode='r'))
+    except (OSError, ValueError):
+        # archivo vacío o que no se puede leer
+        datos = np.zeros(0, dtype=np.uint8)
+    tamanio = len(datos)
+
+    encontrados = {id_mensaje: [] for id_mensaje in MENSAJES_MAVLINK}
+    for inicio in range(0, tamanio, tamanio_bloque):
+        bloque = datos[inicio:inicio + tamanio_bloque]
+        # posibles inicios de mensaje (en el .tlog cada mensaje está precedido por el momento en que se registró, 8 bytes)
+        posiciones = np.flatnonzero((bloque == 0xFE) | (bloque == 0xFD)) + inicio
+        posiciones = posiciones[(posiciones >= 8) & (posiciones + 10 <= tamanio)]
+        # encabezado de cada mensaje: largo del payload e id del mensaje (en MAVLink 2 el id tiene 3 bytes)
+        version_2 = datos[posiciones] == 0xFD
+        largos = datos[posiciones + 1].astype(np.int64)
+        ids = np.where(version_2, 
+                       datos[posiciones + 7] | (datos[posiciones + 8].astype(np.int64) << 8) | (datos[posiciones + 9].astype(np.int64) << 16), 
+                       datos[posiciones + 5])
+
+        for id_mensaje, (nombre, largo_v1, largo_maximo, crc_extra, tipo_datos) in MENSAJES_MAVLINK.items():
+            # en MAVLink 2 se omiten los ceros al final del payload, por lo que el largo puede ser menor
+            candidatos = (ids == id_mensaje) & np.where(version_2, (largos >= 1) & (largos <= largo_maximo), largos == largo_v1)
+            # validar y decodificar juntos los mensajes con la misma versión y el mismo largo
+            for es_version_2, largo in set(zip(version_2[candidatos].tolist(), largos[candidatos].tolist())):
+                encabezado = 10 if es_version_2 else 6
+                posiciones_grupo = posiciones[candidatos & (version_2 == es_version_2) & (largos == largo)]
+                posiciones_grupo = posiciones_grupo[posiciones_grupo + encabezado + largo + 2 <= tamanio]
+                # bytes de cada mensaje desde el largo hasta el CRC, una fila por mensaje
+                mensajes = datos[posiciones_grupo[:, None] + np.arange(1, encabezado + largo + 2)]
+                crc_recibido = mensajes[:, -2].astype(np.uint32) | (mensajes[:, -1].astype(np.uint32) << 8)
+                validos = crc_mavlink(mensajes[:, :-2], crc_extra) == crc_recibido
+                if not validos.any():
+                    continue
+                posiciones_grupo = posiciones_grupo[validos]
+                # completar con ceros los payloads recortados y leerlos con los campos del mensaje
+                payloads = np.zeros((len(posiciones_grupo), tipo_datos.itemsize), dtype=np.uint8)
+                largo_leido = min(largo, tipo_datos.itemsize)
+                payloads[:, :largo_leido] = mensajes[validos, encabezado - 1:encabezado - 1 + largo_leido]
+                # momento en que se registró cada mensaje (microsegundos desde 1970, big-endian)
+                tiempos = np.ascontiguousarray(datos[posiciones_grupo[:, None] + np.arange(-8, 0)]).view('>u8').ravel()
+                encontrados[id_mensaje].append((posiciones_grupo, payloads.view(tipo_datos).ravel(), tiempos.astype(np.int64)))
+
+    # unir los mensajes de cada tipo, en el orden en que aparecen en el archivo
+    mensajes = {}
+    for id_mensaje, (nombre, largo_v1, largo_maximo, crc_extra, tipo_datos) in MENSAJES_MAVLINK.items():
+        grupos = encontrados[id_mensaje]
+        posiciones = np.concatenate([grupo[0] for grupo in grupos]) if grupos else np.zeros(0, dtype=np.int64)
+        orden = np.argsort(posiciones, kind='stable')
+        tabla = np.empty(len(posiciones), dtype=np.dtype(tipo_datos.descr + [('tiempo', '<M8[us]')]))
+        if grupos:
+            registros = np.concatenate([grupo[1] for grupo in grupos])[orden]
+            for campo in tipo_datos.names:
+                tabla[campo] = registros[campo]
+            tabla['tiempo'] = np.concatenate([grupo[2] for grupo in grupos])[orden].astype('<M8[us]')
+        mensajes[nombre] = tabla
+    return mensajes
+
+
+def tiempos_validos(tiempos):
+    # momentos de registro posibles (un momento dañado o desalineado en el archivo puede tener cualquier valor): 
+    # entre el año 2000 y el día siguiente al actual, y sin retroceder respecto de los anteriores
+    minimo = np.datetime64('2000-01-01', 'us')
+    maximo = np.datetime64(datetime.datetime.now() + datetime.timedelta(days=1), 'us')
+    validos = (tiempos >= minimo) & (tiempos <= maximo)
+    return validos & (tiempos >= np.maximum.accumulate(np.where(validos, tiempos, minimo)))
+
+
+def resumen_telemetria(mensajes):
+    '''
+    Obtiene el recorrido, los horarios, la altitud y la velocidad del vuelo a partir de los mensajes leídos con leer_telemetria
+
+    Parameters
+    ----------
+    mensajes : dict
+        Mensajes de cada tipo, tal como los devuelve leer_telemetria
+
+    Returns
+    -------
+    datos
+        dict con la hora de despegue (datetime), las coordenadas del punto de despegue (latitud, longitud, altitud), 
+        hora_aterrizaje, segundos_de_vuelo, altitud_maxima (m sobre el punto de despegue), velocidad_maxima (m/s, pd.NA si no se conoce) 
+        y el recorrido (geometry), o dict vacío si el registro no tiene posiciones válidas
+    '''
+    # usar las posiciones estimadas por el controlador de vuelo y, si no las hay, las del GPS con fix 3D
+    posiciones = mensajes.get('GLOBAL_POSITION_INT', np.zeros(0))
+    if len(posiciones) > 0:
+        posiciones = posiciones[((posiciones['lat'] != 0) | (posiciones['lon'] != 0)) & tiempos_validos(posiciones['tiempo'])]
+    if len(posiciones) > 0:
+        altitudes = posiciones['alt'] / 1000
+        altitudes_relativas = posiciones['relative_alt'] / 1000
+        velocidades = np.hypot(posiciones['vx'], posiciones['vy']) / 100
+    else:
+        posiciones = mensajes.get('GPS_RAW_INT', np.zeros(0))
+        if len(posiciones) > 0:
+            posiciones = posiciones[(posiciones['fix_type'] >= 3) & ((posiciones['lat'] != 0) | (posiciones['lon'] != 0)) 
+                                    & tiempos_validos(posiciones['tiempo'])]
+        if len(posiciones) == 0:
+            return {}
+        altitudes = posiciones['alt'] / 1000
+        altitudes_relativas = altitudes - altitudes[0]
+        # 65535: velocidad desconocida
+        velocidades = np.where(posiciones['vel'] == 65535, np.nan, posiciones['vel'] / 100)
+    latitudes = posiciones['lat'] / 1e7
+    longitudes = posiciones['lon'] / 1e7
+    tiempos = posiciones['tiempo']
+
+    # despegue y aterrizaje: primera y última posición por encima de la altitud mínima (o inicio y fin del registro, si no hay ninguna)
+    en_vuelo = np.flatnonzero(altitudes_relativas > ALTITUD_MINIMA_EN_VUELO)
+    primera, ultima = (en_vuelo[0], en_vuelo[-1]) if len(en_vuelo) > 0 else (0, len(posiciones) - 1)
+    despegue = datetime.datetime.fromtimestamp(tiempos[primera].astype(np.int64) / 1e6)
+    aterrizaje = datetime.datetime.fromtimestamp(tiempos[ultima].astype(np.int64) / 1e6)
+
+    # velocidad respecto del suelo informada en VFR_HUD, o calculada a partir de las posiciones (vacía si no se conoce ninguna)
+    hud = mensajes.get('VFR_HUD', np.zeros(0))
+    if len(hud) > 0:
+        velocidad_maxima = round(float(hud['groundspeed'].max()), 2)
+    elif not np.isnan(velocidades).all():
+        velocidad_maxima = round(float(np.nanmax(velocidades)), 2)
+    else:
+        velocidad_maxima = pd.NA
+
+    datos = {
+        'datetime': pd.Timestamp(despegue),
+        'latitud': float(latitudes[0]),
+        'longitud': float(longitudes[0]),
+        'altitud': float(altitudes[0]),
+        'hora_aterrizaje': aterrizaje.strftime('%H:%M:%S'),
+        'segundos_de_vuelo': (aterrizaje - despegue).total_seconds(),
+        'altitud_maxima': float(altitudes_relativas.max()),
+        'velocidad_maxima': velocidad_maxima,
+    }
+
+    # recorrido, con una posición por segundo como máximo
+    _, indices = np.unique(tiempos.astype('<M8[s]'), return_index=True)
+    indices = np.sort(indices)
+    if len(indices) > 1:
+        datos['geometry'] = geometria.LineString(np.column_stack((longitudes[indices], latitudes[indices], altitudes[indices])))
+    return datos
+
+
 ###################
+# MEMORIA CACHÉ
+# (datos que se pueden volver a generar, guardados en la carpeta del usuario para no recalcularlos)
+
+# tamaño máximo de la memoria caché de mosaicos reducidos, en bytes
+TAMANIO_MAXIMO_CACHE_MOSAICOS = 500 * 1024 * 1024
+TAMANIO_MAXIMO_CACHE_TABLAS = 10 * 1024 * 1024
+TAMANIO_MAXIMO_CACHE_MINIATURAS = 200 * 1024 * 1024
+
+# tamaño en pixels del lado mayor de las miniaturas de las imágenes que se guardan en bitacora.kmz
+TAMANIO_MINIATURAS = 400
+
+
+def carpeta_cache(subcarpeta):
+    # carpeta de la memoria caché: en Windows dentro de 'AppData/Local', en otros sistemas dentro de '~/.cache'
+    carpeta_usuario = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    carpeta = os.path.join(carpeta_usuario, 'bitacora', subcarpeta)
+    os.makedirs(carpeta, exist_ok=True)
+    return carpeta
+
+
+def limpiar_cache(carpeta, tamanio_maximo):
+    # borrar los archivos usados hace más tiempo hasta que el tamaño total de la carpeta sea menor al máximo
+    with os.scandir(carpeta) as entradas:
+        archivos = [entrada for entrada in entradas if entrada.is_file()]
+    tamanio_total = sum(entrada.stat().st_size for entrada in archivos)
+    for entrada in sorted(archivos, key=lambda entrada: entrada.stat().st_mtime):
+        if tamanio_total <= tamanio_maximo:
+            break
+        try:
+            os.remove(entrada.path)
+            tamanio_total -= entrada.stat().st_size
+        except OSError:
+            pass
+
+
+def leer_excel(ruta_archivo):
+    # leer una tabla de excel (como texto), usando una copia en formato csv guardada en la memoria caché, 
+    # que se vuelve a crear si cambia el archivo (leer el csv es mucho más rápido que abrir el xlsx con openpyxl)
+    estado = os.stat(ruta_archivo)
+    clave = hashlib.sha1('|'.join([ruta_archivo, str(estado.st_size), str(estado.st_mtime)]).encode('utf-8')).hexdigest()[:16]
+    carpeta = carpeta_cache('tablas')
+    ruta_cache = os.path.join(carpeta, clave + '.csv')
+    try:
+        return pd.read_csv(ruta_cache, dtype=str, keep_default_na=False)
+    except OSError:
+        pass
+    tabla = pd.read_excel(ruta_archivo, engine='openpyxl', dtype=str).fillna('')
+    try:
+        tabla.to_csv(ruta_cache + '.tmp', index=False)
+        os.replace(ruta_cache + '.tmp', ruta_cache)
+        limpiar_cache(carpeta, TAMANIO_MAXIMO_CACHE_TABLAS)
+    except OSError:
+        pass
+    return tabla
+
+
+def crear_miniatura(ruta_imagen, ruta_miniatura, tamanio):
+    # crear una miniatura jpg de la imagen (decodificando el jpg directamente a menor resolución); devuelve False si no se pudo leer la imagen
+    try:
+        with Image.open(ruta_imagen) as imagen:
+            imagen.draft('RGB', (tamanio, tamanio))
+            miniatura = ImageOps.exif_transpose(imagen)
+            miniatura.thumbnail((tamanio, tamanio))
+            miniatura.convert('RGB').save(ruta_miniatura + '.tmp', 'JPEG', quality=80)
+        os.replace(ruta_miniatura + '.tmp', ruta_miniatura)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def miniaturas_imagenes(rutas_imagenes, tamanio=TAMANIO_MINIATURAS, procesos=None):
+    '''
+    Devuelve una miniatura de cada imagen, guardadas en la memoria caché. 
+    Sólo se crean (en procesos paralelos) las miniaturas que no existen o cuyas imágenes cambiaron (según su tamaño y fecha de modificación)
+
+    Parameters
+    ----------
+    rutas_imagenes : list of str
+        Rutas completas de las imágenes
+    tamanio : int, default=TAMANIO_MINIATURAS
+        Tamaño máximo en pixels del lado mayor de las miniaturas
+    procesos : int or None, default=None
+        Cantidad de procesos en paralelo para crear las miniaturas (None: uno por núcleo del procesador)
+
+    Returns
+    -------
+    rutas_miniaturas
+        list con la ruta de la miniatura de cada imagen (o None si no se pudo leer la imagen)
+    '''
+    carpeta = carpeta_cache('miniaturas')
+    limpiar_cache(carpeta, TAMANIO_MAXIMO_CACHE_MINIATURAS)
+    rutas_miniaturas = []
+    pendientes = []
+    for ruta_imagen in rutas_imagenes:
+        try:
+            estado = os.stat(ruta_imagen)
+        except OSError:
+            rutas_miniaturas.append(None)
+            continue
+        clave = hashlib.sha1('|'.join([ruta_imagen, str(estado.st_size), str(estado.st_mtime), str(tamanio)]).encode('utf-8')).hexdigest()[:16]
+        ruta_miniatura = os.path.join(carpeta, clave + '.jpg')
+        rutas_miniaturas.append(ruta_miniatura)
+        if not os.path.exists(ruta_miniatura):
+            pendientes.append((ruta_imagen, ruta_miniatura))
+    if len(pendientes) > 0:
+        imagenes, miniaturas = zip(*pendientes)
+        if procesos != 1: procesos = procesos or os.cpu_count() or 1
+        if procesos == 1 or len(pendientes) == 1:
+            resultados = list(map(crear_miniatura, imagenes, miniaturas, itertools.repeat(tamanio)))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+                resultados = list(ejecutor.map(crear_miniatura, imagenes, miniaturas, itertools.repeat(tamanio), chunksize=8))
+        fallidas = {ruta_miniatura for ruta_miniatura, resultado in zip(miniaturas, resultados) if not resultado}
+        rutas_miniaturas = [None if ruta_miniatura in fallidas else ruta_miniatura for ruta_miniatura in rutas_miniaturas]
+    return rutas_miniaturas
+
+###################
+# LOCALIDADES
+# (índice de ciudades de GeoNames incluido en reverse_geocoder, guardado en la memoria caché para abrirlo sin volver a leer el archivo csv)
+
+global indice_localidades
+indice_localidades = None
+
+# grilla del índice de localidades: las ciudades se ordenan por celda, para buscar sólo en las celdas cercanas a cada punto
+TAMANIO_CELDA_LOCALIDADES = 1   # en grados
+FILAS_GRILLA_LOCALIDADES = int(180 / TAMANIO_CELDA_LOCALIDADES)
+COLUMNAS_GRILLA_LOCALIDADES = int(360 / TAMANIO_CELDA_LOCALIDADES)
+
+
+def celda_localidades(latitudes, longitudes):
+    # fila y columna de la grilla que contiene cada par de coordenadas
+    filas = np.clip(((np.asarray(latitudes) + 90) // TAMANIO_CELDA_LOCALIDADES).astype(np.int64), 0, FILAS_GRILLA_LOCALIDADES - 1)
+    columnas = np.clip(((np.asarray(longitudes) + 180) // TAMANIO_CELDA_LOCALIDADES).astype(np.int64), 0, COLUMNAS_GRILLA_LOCALIDADES - 1)
+    return filas, columnas
+
+
+def abrir_indice_localidades():
+    '''
+    Abre el índice de localidades (sólo la primera vez que se usa en cada proceso), creándolo si no existe
+
+    El índice se guarda ya ordenado por celdas de la grilla, por lo que al abrirlo no se construye ninguna estructura: 
+    los archivos se abren como memoria mapeada y cada búsqueda lee del disco sólo las celdas cercanas al punto buscado
+
+    Returns
+    -------
+    coordenadas, celdas, nombres, posiciones
+        coordenadas (latitud, longitud) de las ciudades ordenadas por celda, posición de inicio de cada celda en coordenadas 
+        (por filas de la grilla, con una posición final adicional), texto con los nombres de todas las localidades (utf-8) 
+        en el mismo orden, y posición de inicio de cada nombre dentro del texto 
+        (o None si no se encuentra el archivo de ciudades de reverse_geocoder)
+    '''
+    global indice_localidades
+    if indice_localidades is not None:
+        return indice_localidades
+    # archivo de ciudades de reverse_geocoder (sin importar la librería, que lo lee completo al importarla)
+    especificacion = importlib.util.find_spec('reverse_geocoder')
+    if especificacion is None or especificacion.origin is None:
+        return None
+    ruta_ciudades = os.path.join(os.path.dirname(especificacion.origin), 'rg_cities1000.csv')
+    if not os.path.isfile(ruta_ciudades):
+        return None
+    estado = os.stat(ruta_ciudades)
+    clave = hashlib.sha1('|'.join([ruta_ciudades, str(estado.st_size), str(estado.st_mtime), 'grilla', str(TAMANIO_CELDA_LOCALIDADES)]).encode('utf-8')).hexdigest()[:16]
+    carpeta = carpeta_cache('localidades')
+    rutas = [os.path.join(carpeta, clave + '_' + nombre + '.npy') for nombre in ('coordenadas', 'celdas', 'nombres', 'posiciones')]
+    # crear el índice si no existe
+    if not all(os.path.exists(ruta) for ruta in rutas):
+        ciudades = pd.read_csv(ruta_ciudades, dtype=str, keep_default_na=False)
+        coordenadas = ciudades[['lat', 'lon']].to_numpy(dtype=np.float64)
+        # ordenar las ciudades por celda (fila por fila de la grilla)
+        filas, columnas = celda_localidades(coordenadas[:, 0], coordenadas[:, 1])
+        numeros_de_celda = filas * COLUMNAS_GRILLA_LOCALIDADES + columnas
+        orden = np.argsort(numeros_de_celda, kind='stable')
+        ciudades, coordenadas = ciudades.iloc[orden], coordenadas[orden]
+        celdas = np.searchsorted(numeros_de_celda[orden], np.arange(FILAS_GRILLA_LOCALIDADES * COLUMNAS_GRILLA_LOCALIDADES + 1))
+        textos = (ciudades['name'] + ', ' + ciudades['admin1'] + ', ' + ciudades['cc']).str.encode('utf-8')
+        posiciones = np.concatenate([[0], np.cumsum(textos.str.len().to_numpy(dtype=np.int64))])
+        nombres = np.frombuffer(b''.join(textos), dtype=np.uint8)
+        for ruta, datos in zip(rutas, (coordenadas, celdas.astype(np.int64), nombres, posiciones)):
+            with open(ruta + '.tmp', 'wb') as archivo:
+                np.save(archivo, datos)
+            os.replace(ruta + '.tmp', ruta)
+    # abrir el índice sin cargarlo en memoria (los datos se leen del disco a medida que se usan)
+    indice_localidades = tuple(np.load(ruta, mmap_mode='r') for ruta in rutas)
+    return indice_localidades
+
+
+def localidad_mas_cercana(coordenadas, celdas, latitud, longitud):
+    # recorrer anillos de celdas cada vez más alejados de la celda del punto, hasta que las ciudades de los anillos siguientes 
+    # no puedan estar más cerca que la más cercana encontrada (distancia en grados, como la que usa reverse_geocoder)
+    fila, columna = (int(valor) for valor in celda_localidades(latitud, longitud))
+    mas_cercana, distancia_minima = -1, np.inf
+    for anillo in range(max(FILAS_GRILLA_LOCALIDADES, COLUMNAS_GRILLA_LOCALIDADES)):
+        columna_inicial = max(columna - anillo, 0)
+        columna_final = min(columna + anillo, COLUMNAS_GRILLA_LOCALIDADES - 1)
+        for fila_anillo in range(max(fila - anillo, 0), min(fila + anillo, FILAS_GRILLA_LOCALIDADES - 1) + 1):
+            # en las filas de los extremos del anillo se recorren todas sus columnas, en las demás sólo las dos columnas de los extremos
+            if abs(fila_anillo - fila) == anillo:
+                tramos = [(columna_inicial, columna_final)]
+            else:
+                tramos = [(c, c) for c in {columna - anillo, columna + anillo} if 0 <= c < COLUMNAS_GRILLA_LOCALIDADES]
+            for inicio, fin in tramos:
+                # las celdas consecutivas de una fila están guardadas juntas
+                desde = celdas[fila_anillo * COLUMNAS_GRILLA_LOCALIDADES + inicio]
+                hasta = celdas[fila_anillo * COLUMNAS_GRILLA_LOCALIDADES + fin + 1]
+                if hasta == desde:
+                    continue
+                distancias = (coordenadas[desde:hasta, 0] - latitud) ** 2 + (coordenadas[desde:hasta, 1] - longitud) ** 2
+                i = int(np.argmin(distancias))
+                if distancias[i] < distancia_minima:
+                    mas_cercana, distancia_minima = desde + i, distancias[i]
+        if distancia_minima <= (anillo * TAMANIO_CELDA_LOCALIDADES) ** 2:
+            break
+    return mas_cercana
+
+
+def buscar_localidades(coordenadas):
+    '''
+    Busca la localidad más cercana a cada par de coordenadas, abriendo el índice una sola vez para todas
+
+    Parameters
+    ----------
+    coordenadas : list of tuple
+        Lista de coordenadas (latitud, longitud)
+
+    Returns
+    -------
+    localidades
+        Lista con el nombre de cada localidad ('ciudad, provincia, país'), o pd.NA si las coordenadas no son válidas 
+        o no se encuentra el índice de localidades
+    '''
+    coordenadas = np.asarray(coordenadas, dtype=np.float64).reshape(-1, 2)
+    localidades = [pd.NA] * len(coordenadas)
+    validas = np.flatnonzero(np.isfinite(coordenadas).all(axis=1))
+    if len(validas) == 0:
+        return localidades
+    indice = abrir_indice_localidades()
+    if indice is None:
+        return localidades
+    coordenadas_ciudades, celdas, nombres, posiciones = indice
+    for i in validas:
+        ciudad = localidad_mas_cercana(coordenadas_ciudades, celdas, coordenadas[i, 0], coordenadas[i, 1])
+        localidades[i] = bytes(nombres[posiciones[ciudad]:posiciones[ciudad+1]]).decode('utf-8')
+    return localidades
+
+
+###################
+# VARIABLES
+# (nombres de las variables del vuelo en cada idioma, leídos de variables.xlsx una sola vez por proceso)
+
+
+global registro_variables
+registro_variables = None
+
+
+class RegistroVariables:
+    # tabla de variables, con búsquedas directas de cada variable por su id y del nombre de cada variable en cada idioma
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self.variables = tabla['variable'].tolist()
+        self.variable_por_id = dict(zip(tabla['id'], tabla['variable']))
+        idiomas = [columna for columna in tabla.columns if columna not in ('id', 'variable')]
+        self.nombres = {idioma: dict(zip(tabla['variable'], tabla[idioma])) for idioma in idiomas}
+
+
+def abrir_registro_variables():
+    '''
+    Devuelve el registro de variables, leyéndolo la primera vez que se usa en cada proceso 
+    (variables.xlsx se lee desde la copia en formato csv de la memoria caché, ver leer_excel)
+
+    Returns
+    -------
+    registro_variables
+        RegistroVariables con la tabla de variables
+    '''
+    global registro_variables
+    if registro_variables is not None:
+        return registro_variables
+    ruta_programa = inspect.getframeinfo(inspect.currentframe()).filename
+    carpeta_programa = os.path.dirname(os.path.abspath(ruta_programa))
+    ruta_archivo_variables = os.path.join(carpeta_programa, 'bitacora_archivos', 'variables.xlsx')
+    registro_variables = RegistroVariables(leer_excel(ruta_archivo_variables))
+    return registro_variables
+
+
+###################
+
+
+class VueloCancelado(Exception):
+    # se produce cuando se cancela la importación de un vuelo (ver Vuelo.importar)
+    pass
 
 
 class Vuelo:
@@ -68,14 +872,20 @@ class Vuelo:
         self.carpeta       =  carpeta
         self.bitacora_csv  = 'bitacora.csv'
         self.bitacora_kml  = 'bitacora.kml'
+        self.bitacora_kmz  = 'bitacora.kmz'
         self.bitacora_png  = 'bitacora.png'
+        self.bitacora_manifiesto = 'bitacora_manifiesto.json'
+        self.calidad_mapa  = 'exportar'
+        # planes de vuelo y polígonos ya leídos (ver leer_geometria)
+        self.geometrias_leidas = {}
+        # resúmenes de cada tipo de archivo, y tipos con cambios que aún no se volvieron a resumir (ver resumenes_por_tipo)
+        self.resumenes = {}
+        self.tipos_modificados = set()
         global version_bitacora
 
-        # leer nombres de variables
-        ruta_programa = inspect.getframeinfo(inspect.currentframe()).filename
-        carpeta_programa = os.path.dirname(os.path.abspath(ruta_programa))
-        ruta_archivo_variables = os.path.join(carpeta_programa, 'bitacora_archivos', 'variables.xlsx')
-        self.tabla_variables = pd.read_excel(ruta_archivo_variables, engine='openpyxl')
+        # nombres de variables
+        self.registro_variables = abrir_registro_variables()
+        self.tabla_variables = self.registro_variables.tabla
 
         if leer_bitacora:
             # si ya hay una tabla de datos, leerla
@@ -91,8 +901,7 @@ class Vuelo:
 
         if not leer_bitacora:
             # crear una tabla de datos vacía
-            lista_variables = self.tabla_variables['variable'].tolist()
-            self.info = dict.fromkeys(lista_variables)
+            self.info = dict.fromkeys(self.registro_variables.variables)
             self.info['carpeta'] = carpeta
             self.info['nombre'] = nombre
             self.info['descripcion'] = descripcion
@@ -115,19 +924,19 @@ class Vuelo:
         datos_archivo = pd.read_csv(ruta_csv, header=None)
 
         # armar diccionario con los datos del archivo
-        lista_variables = self.tabla_variables['variable'].tolist()
-        self.info = dict.fromkeys(lista_variables)
-        for i, row in datos_archivo.iterrows():
-            # columna 0: id - columna 1: nombre de la variable - columna 2: valor
-            id = row[0]
-            variable = self.tabla_variables.loc[self.tabla_variables['id']==id, 'variable'].values[0]
-            valor = row[2]
+        self.info = dict.fromkeys(self.registro_variables.variables)
+        # columna 0: id - columna 1: nombre de la variable - columna 2: valor
+        for id, valor in zip(datos_archivo[0], datos_archivo[2]):
+            variable = self.registro_variables.variable_por_id.get(id)
+            if variable is None:
+                # variable que no está en esta versión del programa
+                continue
             if pd.isna(valor):
                 valor = ''
             self.info[variable] = valor
 
 
-    def importar(self, ruta_archivo, reemplazar=False) -> bool:
+    def importar(self, ruta_archivo, reemplazar=False, procesos=1, manifiesto=False, progreso=None, cancelar=None, mostrar=True) -> bool:
         '''
         Importa un archivo e incorpora los datos a la tabla de archivos
 
@@ -137,6 +946,18 @@ class Vuelo:
             Ruta completa del archivo, carpeta o lista de múltiples archivos que se quieren importar
         reemplazar : bool, default=False
             Define si se reemplazan los datos existentes si ya existe en la tabla de archivos un archivo con el mismo nombre
+        procesos : int or None, default=1
+            Cantidad de procesos en paralelo para leer los datos EXIF de las imágenes (None: uno por núcleo del procesador)
+        manifiesto : bool, default=False
+            Define si se reutilizan los datos guardados en el manifiesto de la carpeta para los archivos que no cambiaron (mismo tamaño y fecha de modificación), 
+            y si se guarda luego el manifiesto actualizado
+        progreso : callable, optional
+            Función que recibe periódicamente un dict con el avance de la importación 
+            (etapa, archivos_encontrados, archivos_leidos, imagenes_leidas)
+        cancelar : threading.Event, optional
+            Evento para cancelar la importación: si se activa, se produce VueloCancelado sin modificar el vuelo ni el manifiesto
+        mostrar : bool, default=True
+            Define si se muestra en la consola cada archivo agregado (ver agregar_registros)
 
         Returns
         -------
@@ -144,229 +965,284 @@ class Vuelo:
             True si se pudo importar el archivo, False si no
         '''
 
-        # chequear si se quiere importar una carpeta completa
-        if os.path.isdir(ruta_archivo):
-            carpeta = ruta_archivo
-            # convertir la carpeta en una lista de archivos individuales
-            ruta_archivo = sorted([os.path.join(carpeta, file) for file in os.listdir(carpeta)])
-            # llamar nuevamente a esta función para cada uno de ellos
-            resultado = False
-            for ruta_archivo_individual in ruta_archivo:
-                resultado_parcial = self.importar(ruta_archivo_individual, reemplazar=reemplazar)
-                resultado = resultado or resultado_parcial
-            return resultado
+        if isinstance(ruta_archivo, str): ruta_archivo = [ruta_archivo]
+        registros_guardados = self.leer_manifiesto() if manifiesto else {}
+        if procesos != 1: procesos = procesos or os.cpu_count() or 1
+        ejecutor = None
+
+        # procesar los archivos a medida que se recorren las carpetas
+        # (cada archivo pendiente queda como [ruta, tamaño, fecha de modificación, datos del archivo, lectura en paralelo])
+        archivos = []
+        futuros = []
+        avance = {'etapa': 'importar', 'archivos_encontrados': 0, 'archivos_leidos': 0, 'imagenes_leidas': 0}
+        ultimo_aviso = [0.0]
+
+        def informar(forzar=False):
+            # detener la importación si se canceló, e informar el avance como máximo cada 0.1 segundos
+            if cancelar is not None and cancelar.is_set():
+                raise VueloCancelado()
+            if progreso is not None and (forzar or time.perf_counter() - ultimo_aviso[0] >= 0.1):
+                ultimo_aviso[0] = time.perf_counter()
+                leidas_en_paralelo = sum(futuro.done() for futuro in futuros)
+                progreso(dict(avance, 
+                    archivos_leidos=avance['archivos_leidos'] + leidas_en_paralelo, 
+                    imagenes_leidas=avance['imagenes_leidas'] + leidas_en_paralelo))
+
+        try:
+            for ruta_archivo_individual, tamanio, mtime in self.archivos_a_importar(ruta_archivo):
+                avance['archivos_encontrados'] += 1
+                tipo = TIPOS_ARCHIVO.get(os.path.splitext(ruta_archivo_individual)[1].lower())
+                # reutilizar los datos de los archivos que no cambiaron desde la última importación
+                guardado = registros_guardados.get(os.path.relpath(ruta_archivo_individual, self.carpeta))
+                if guardado is not None and (guardado['tamanio'], guardado['mtime']) == (tamanio, mtime):
+                    archivos.append([ruta_archivo_individual, tamanio, mtime, guardado['registro'], None])
+                    avance['archivos_leidos'] += 1
+                # leer en procesos paralelos los archivos de los tipos que lo permiten (los datos EXIF de las imágenes)
+                elif procesos != 1 and tipo is not None and tipo.paralelo:
+                    if ejecutor is None: ejecutor = concurrent.futures.ProcessPoolExecutor(max_workers=procesos)
+                    futuros.append(ejecutor.submit(leer_archivo, ruta_archivo_individual))
+                    archivos.append([ruta_archivo_individual, tamanio, mtime, None, futuros[-1]])
+                else:
+                    archivos.append([ruta_archivo_individual, tamanio, mtime, self.registro_archivo(ruta_archivo_individual, tamanio=tamanio, mtime=mtime), None])
+                    avance['archivos_leidos'] += 1
+                    if tipo is not None and tipo.nombre == 'imagen': avance['imagenes_leidas'] += 1
+                informar()
+            # completar los datos de los archivos leídos en paralelo (en el mismo orden en que se recorrieron)
+            for archivo in archivos:
+                if archivo[4] is not None:
+                    archivo[3] = self.registro_archivo(archivo[0], archivo[4].result(), tamanio=archivo[1], mtime=archivo[2])
+                    informar()
+            informar(forzar=True)
+        finally:
+            if ejecutor is not None: ejecutor.shutdown(cancel_futures=True)
+
+        # incorporar los datos de todos los archivos juntos a la tabla
+        registros = [registro for ruta_archivo_individual, tamanio, mtime, registro, futuro in archivos if registro is not None]
+        # guardar el manifiesto (sólo con los archivos actuales, los archivos borrados se descartan)
+        if manifiesto:
+            registros_manifiesto = {}
+            for ruta_archivo_individual, tamanio, mtime, registro, futuro in archivos:
+                if registro is not None:
+                    registros_manifiesto[os.path.relpath(ruta_archivo_individual, self.carpeta)] = {'tamanio': tamanio, 'mtime': mtime, 'registro': registro}
+            self.guardar_manifiesto(registros_manifiesto)
+        return self.agregar_registros(registros, reemplazar=reemplazar, mostrar=mostrar)
+
+
+    def archivos_a_importar(self, lista_rutas):
+        # recorrer las carpetas (incluyendo subcarpetas) y los archivos individuales, devolviendo ruta, tamaño y fecha de modificación
+        for ruta in lista_rutas:
+            if os.path.isdir(ruta):
+                yield from recorrer_carpeta(ruta)
+            elif os.path.isfile(ruta):
+                estado = os.stat(ruta)
+                yield ruta, estado.st_size, estado.st_mtime
+
+
+
+    def leer_manifiesto(self):
+        '''
+        Lee el manifiesto de la carpeta del vuelo, con los datos de cada archivo importado previamente
+
+        Returns
+        -------
+        registros
+            dict con la ruta relativa de cada archivo como clave, y como valor un dict con el tamaño (tamanio), fecha de modificación (mtime) y datos del archivo (registro)
+        '''
+        ruta_manifiesto = os.path.join(self.carpeta, self.bitacora_manifiesto)
+        if not os.path.exists(ruta_manifiesto):
+            return {}
+        try:
+            with open(ruta_manifiesto, encoding='utf-8') as archivo:
+                manifiesto = json.load(archivo)
+        except (OSError, ValueError):
+            return {}
+        # si el manifiesto fue creado con otro formato, no utilizarlo
+        if manifiesto.get('version_manifiesto') != VERSION_MANIFIESTO:
+            return {}
+        registros = manifiesto['archivos']
+        for guardado in registros.values():
+            registro = guardado['registro']
+            for dato, valor in registro.items():
+                if valor is None: registro[dato] = pd.NA
+                elif dato == 'datetime': registro[dato] = pd.Timestamp(valor)
+                elif dato == 'geometry': registro[dato] = wkb.loads(valor, hex=True)
+        return registros
+
+
+    def guardar_manifiesto(self, registros) -> None:
+        # convertir los datos a formatos compatibles con json (las geometrías en formato WKB hexadecimal, para no perder precisión)
+        archivos = {}
+        for ruta_relativa, guardado in registros.items():
+            registro = {}
+            for dato, valor in guardado['registro'].items():
+                if dato == 'geometry' and valor is not None and pd.notna(valor): valor = wkb.dumps(valor, hex=True)
+                elif dato == 'datetime': valor = pd.Timestamp(valor).isoformat()
+                elif pd.isna(valor): valor = None
+                elif isinstance(valor, np.generic): valor = valor.item()
+                registro[dato] = valor
+            archivos[ruta_relativa] = {'tamanio': guardado['tamanio'], 'mtime': guardado['mtime'], 'registro': registro}
+        manifiesto = {'version_manifiesto': VERSION_MANIFIESTO, 'archivos': archivos}
+        # escribir primero un archivo temporal y luego reemplazar el anterior, para no dejar un manifiesto incompleto si se interrumpe
+        ruta_manifiesto = os.path.join(self.carpeta, self.bitacora_manifiesto)
+        try:
+            with open(ruta_manifiesto + '.tmp', 'w', encoding='utf-8') as archivo:
+                json.dump(manifiesto, archivo)
+            os.replace(ruta_manifiesto + '.tmp', ruta_manifiesto)
+        except OSError:
+            # si no se puede escribir en la carpeta (por ejemplo, de sólo lectura), la importación continúa sin manifiesto
+            pass
+
+
+
+    def registro_archivo(self, ruta_archivo, datos_archivo=None, tamanio=None, mtime=None):
+        '''
+        Obtiene los datos de un archivo, sin incorporarlos a la tabla de archivos
+
+        Parameters
+        ----------
+        ruta_archivo : str
+            Ruta completa del archivo
+        datos_archivo : dict, optional
+            Datos propios del tipo de archivo, si ya fueron leídos previamente con leer_archivo (por ejemplo, en un proceso paralelo)
+        tamanio, mtime : optional
+            Tamaño y fecha de modificación del archivo, si ya fueron obtenidos al recorrer la carpeta
+
+        Returns
+        -------
+        registro
+            dict con los datos del archivo, o None si el archivo no existe o no es de ninguno de los tipos listados
+        '''
+
+        # chequear si el archivo a importar se corresponde con alguna de las extensiones de los tipo de archivo listados
+        subcarpeta, archivo = os.path.split(ruta_archivo)
+        tipo = TIPOS_ARCHIVO.get(os.path.splitext(archivo)[1].lower())
+        # si el archivo no es de ninguno de los tipos listados, no importarlo
+        if tipo is None:
+            return None
 
         # chequear si el archivo que se quiere importar existe
-        if os.path.isfile(ruta_archivo):
-            # datos básicos del archivo
-            subcarpeta, archivo = os.path.split(ruta_archivo)
-            subcarpeta = os.path.relpath(subcarpeta, self.carpeta)
-            tamanio = os.path.getsize(ruta_archivo)
-            datetime_archivo = pd.to_datetime(datetime.datetime.fromtimestamp(os.path.getmtime(ruta_archivo)))
-            fecha = datetime_archivo.strftime('%Y-%m-%d')
-            hora = datetime_archivo.strftime('%H:%M:%S')
-
-            # chequear si el archivo a importar se corresponde con alguna de las extensiones de los tipo de archivo listados
-            extensiones = {
-                'imagen':        ['.jpg', '.jpeg'],
-                'telemetría':    ['.tlog'],
-                'polígono':      ['.poly'],
-                'plan de vuelo': ['.waypoints', '.grid'],
-                'mosaico / dem': ['.tif', '.tiff']
-            } 
-            tipo_archivo = ''
-            for posible_tipo_archivo in reversed(list(extensiones.keys())):
-                for extension in extensiones[posible_tipo_archivo]:
-                    if archivo.lower().endswith(extension):
-                        tipo_archivo = posible_tipo_archivo
-            # si el archivo no es de ninguno de los tipos listados, no importarlo
-            if tipo_archivo == '':
-                return False
-
-            # chequear si ya existe un archivo igual en la tabla de archivos del proyecto, para reemplazarlo
-            archivos_iguales = self.elementos.loc[(self.elementos.archivo == archivo) & (self.elementos.subcarpeta == subcarpeta)]
-            if len(archivos_iguales)>0:
-                if reemplazar:
-                    fila = archivos_iguales.index.values[0]
-                else:
-                    return False
-            else:
-                fila = len(self.elementos)
-
-            # llenar la fila de la tabla con valores 'NA'
-            fila_vacia = pd.Series(pd.NA * len(self.elementos.columns), index=self.elementos.columns)
-            self.elementos.loc[fila] = fila_vacia
-            
-            # incorporar los datos básicos
-            self.elementos.loc[fila, 'archivo'] = archivo
-            self.elementos.loc[fila, 'subcarpeta'] = subcarpeta
-            self.elementos.loc[fila, 'tipo_archivo'] = tipo_archivo
-            self.elementos.loc[fila, 'tamanio'] = tamanio
-            self.elementos.loc[fila, 'fecha'] = fecha
-            self.elementos.loc[fila, 'hora'] = hora
-            self.elementos.loc[fila, 'datetime'] = datetime_archivo
-
-            # incorporar coordenadas y modificar fecha y hora, según el tipo de archivo
-
-            if tipo_archivo == 'imagen':
-                self.fila_datos_imagen(fila)
-            if tipo_archivo == 'telemetría':
-                self.fila_datos_telemetria(fila)
-            if tipo_archivo == 'plan de vuelo':
-                self.fila_datos_plan_de_vuelo(fila)
-            if tipo_archivo == 'polígono':
-                self.fila_datos_poligono(fila)
-            #if tipo_archivo == 'mosaico / dem':
-
-            print('Se agregó el archivo ' + archivo + ' - Tipo de archivo: ' + tipo_archivo)
-            return True
+        if tamanio is None or mtime is None:
+            if not os.path.isfile(ruta_archivo):
+                return None
+            estado = os.stat(ruta_archivo)
+            tamanio, mtime = estado.st_size, estado.st_mtime
+
+        # datos básicos del archivo
+        registro = {
+            'archivo': archivo,
+            'subcarpeta': os.path.relpath(subcarpeta, self.carpeta),
+            'tipo_archivo': tipo.nombre,
+            'tamanio': tamanio,
+            'datetime': datetime.datetime.fromtimestamp(mtime),
+        }
 
-        else:
-            # si el archivo no existe
-            return False
+        # incorporar coordenadas y modificar fecha y hora, según el tipo de archivo
+        if datos_archivo is None: datos_archivo = tipo.leer(self, ruta_archivo)
+        registro.update(datos_archivo)
 
+        return registro
 
 
-    def fila_datos_imagen(self, fila_elemento): 
-        archivo = self.elementos.loc[fila_elemento, 'archivo']
-        subcarpeta = self.elementos.loc[fila_elemento, 'subcarpeta']
-        ruta_archivo = os.path.join(self.carpeta, subcarpeta, archivo)
-        # leer datos EXIF
-        with open(ruta_archivo, "rb") as datos_imagen:
-            imagen = exif.Image(datos_imagen)
-        # obtener fecha y hora de captura de la imagen
-        if imagen.has_exif:
-            datetime_original = imagen.get('datetime_original', pd.NA)
-            if pd.notna(datetime_original):
-                fecha, hora = datetime_original.split()
-                fecha = fecha.replace(':','-')
-                datetime_archivo = pd.to_datetime(fecha + ' ' + hora)
-                # incorporar los datos a la tabla
-                self.elementos.loc[fila_elemento, 'fecha'] = fecha
-                self.elementos.loc[fila_elemento, 'hora'] = hora
-                self.elementos.loc[fila_elemento, 'datetime'] = datetime_archivo
-            # obtener datos de la cámara
-            marca = imagen.get('make', pd.NA)
-            modelo = imagen.get('model', pd.NA)
-            if pd.notna(marca) & pd.notna(modelo):
-                if modelo.startswith(marca): camara = modelo
-                else: camara = marca + ' - ' + modelo
-            else:
-                if pd.notna(marca): camara = marca
-                elif pd.notna(modelo): camara = modelo
-                else: camara = pd.NA
-            # velocidad de exposición
-            exposicion = imagen.get('exposure_time', pd.NA)
-            # sensibilidad ISO
-            iso_1 = imagen.get('iso_speed_ratings', pd.NA)
-            iso_2 = imagen.get('photographic_sensitivity', pd.NA)
-            if pd.notna(iso_1): iso = iso_1
-            elif pd.notna(iso_2): iso = iso_2
-            else: iso = pd.NA
-            # incorporar los datos a la tabla
-            self.elementos.loc[fila_elemento, 'camara'] = camara
-            self.elementos.loc[fila_elemento, 'exposicion'] = exposicion
-            self.elementos.loc[fila_elemento, 'iso'] = iso
-            
-            # obtener coordenadas GPS
-            latitud = imagen.get('gps_latitude', pd.NA)
-            if pd.notna(latitud):
-                latitud = self.coordenadas_decimales(imagen.gps_latitude, imagen.gps_latitude_ref)
-                longitud = self.coordenadas_decimales(imagen.gps_longitude, imagen.gps_longitude_ref)
-                altitud = imagen.gps_altitude
-                geometry = Point(longitud, latitud, altitud)
-                # incorporar los datos a la tabla
-                self.elementos.loc[fila_elemento, 'latitud'] = latitud
-                self.elementos.loc[fila_elemento, 'longitud'] = longitud
-                self.elementos.loc[fila_elemento, 'altitud'] = altitud
-                self.elementos.loc[fila_elemento, 'geometry'] = geometry
-
-    def coordenadas_decimales(self, coordenadas, coordenadas_ref):
-        grados_decimales = coordenadas[0] + \
-                        coordenadas[1] / 60 + \
-                        coordenadas[2] / 3600
-        if coordenadas_ref == "S" or coordenadas_ref == "W":
-            grados_decimales = -grados_decimales
-        return grados_decimales
-
-
-    def fila_datos_telemetria(self, fila_elemento):
-        archivo = self.elementos.loc[fila_elemento, 'archivo']
-        # obtener fecha y hora del nombre de archivo
-        fecha = archivo[:10]
-        hora = archivo[11:19].replace('-',':')
-        datetime_archivo = pd.to_datetime(fecha + ' ' + hora)
-        # incorporar los datos a la tabla
-        self.elementos.loc[fila_elemento, 'fecha'] = fecha
-        self.elementos.loc[fila_elemento, 'hora'] = hora
-        self.elementos.loc[fila_elemento, 'datetime'] = datetime_archivo
-
-
-    def fila_datos_plan_de_vuelo(self, fila_elemento):
-        archivo = self.elementos.loc[fila_elemento, 'archivo']
-        subcarpeta = self.elementos.loc[fila_elemento, 'subcarpeta']
-        ruta_archivo = os.path.join(self.carpeta, subcarpeta, archivo)
-        if archivo.endswith('.waypoints'):
-            geometry, altitud_inicial, altitud_media, velocidad_de_vuelo = self.leer_plan_de_vuelo(ruta_archivo)
-            self.elementos.loc[fila_elemento, 'latitud'] = geometry.centroid.xy[1][0]
-            self.elementos.loc[fila_elemento, 'longitud'] = geometry.centroid.xy[0][0]
-            self.elementos.loc[fila_elemento, 'altitud'] = altitud_inicial
-            self.elementos.loc[fila_elemento, 'geometry'] = geometry
 
+    def agregar_registros(self, registros, reemplazar=False, mostrar=True) -> bool:
+        '''
+        Incorpora a la tabla de archivos los datos obtenidos con registro_archivo, armando todas las filas juntas
 
+        Parameters
+        ----------
+        registros : list of dict
+            Datos de cada archivo
+        reemplazar : bool, default=False
+            Define si se reemplazan los datos existentes si ya existe en la tabla de archivos un archivo con el mismo nombre
+        mostrar : bool, default=True
+            Define si se muestra en la consola cada archivo agregado
 
-    def leer_plan_de_vuelo(self, ruta_plan_de_vuelo):
-        puntos = []
-        altitud_inicial = 0
-        with open(ruta_plan_de_vuelo) as archivo:
-            for linea in archivo:
-                if not linea.startswith('QGC'):
-                    INDEX, CURRENT_WP, COORD_FRAME, COMMAND, PARAM1, PARAM2, PARAM3, PARAM4, PARAM5_X_LATITUDE, PARAM6_Y_LONGITUDE, PARAM7_Z_ALTITUDE, AUTOCONTINUE = linea.split()
-                    
-                    if (INDEX=='0') & (COORD_FRAME=='0'):
-                        altitud_inicial = float(PARAM7_Z_ALTITUDE)
-
-                    if COMMAND=='178':
-                        velocidad = float(PARAM2)
-
-                    if (COMMAND=='16') &(INDEX!='0'):
-                        if COORD_FRAME=='0': # altitud absoluta
-                            altitud = float(PARAM7_Z_ALTITUDE)
-                        if COORD_FRAME=='3': # altitud relativa
-                            altitud = float(PARAM7_Z_ALTITUDE) + altitud_inicial                    
-                        puntos.append([float(PARAM6_Y_LONGITUDE), float(PARAM5_X_LATITUDE), altitud])
+        Returns
+        -------
+        resultado
+            True si se incorporó algún archivo, False si no
+        '''
+
+        # chequear si ya existen archivos iguales en la tabla de archivos del proyecto, para reemplazarlos
+        filas_existentes = dict(zip(zip(self.elementos.archivo, self.elementos.subcarpeta), self.elementos.index))
+        siguiente_fila = len(self.elementos)
+        filas = []
+        registros_a_agregar = []
+        for registro in registros:
+            fila = filas_existentes.get((registro['archivo'], registro['subcarpeta']))
+            if fila is None:
+                fila = siguiente_fila
+                siguiente_fila += 1
+            elif not reemplazar:
+                continue
+            filas.append(fila)
+            registros_a_agregar.append(registro)
+            if mostrar: print('Se agregó el archivo ' + registro['archivo'] + ' - Tipo de archivo: ' + registro['tipo_archivo'])
+        if len(registros_a_agregar) == 0:
+            return False
+        self.tipos_modificados.update(registro['tipo_archivo'] for registro in registros_a_agregar)
+
+        # armar las columnas de la tabla (las columnas que no existen se agregan en el orden en que aparecen los datos)
+        columnas = list(self.elementos.columns)
+        for registro in registros_a_agregar:
+            for columna in registro:
+                if columna not in columnas: columnas.append(columna)
+        datos = {columna: [registro.get(columna, pd.NA) for registro in registros_a_agregar] for columna in columnas if columna != 'geometry'}
+        nuevos_elementos = pd.DataFrame(datos, index=filas, dtype=object)
+
+        # fecha y hora a partir del datetime de cada archivo
+        nuevos_elementos['datetime'] = pd.to_datetime(nuevos_elementos['datetime'])
+        nuevos_elementos['fecha'] = nuevos_elementos['datetime'].dt.strftime('%Y-%m-%d').astype(object)
+        nuevos_elementos['hora'] = nuevos_elementos['datetime'].dt.strftime('%H:%M:%S').astype(object)
+
+        # geometrías: las de los planes de vuelo y polígonos ya están armadas, y las de las imágenes se arman todas juntas a partir de las coordenadas
+        geometry = gpd.GeoSeries([registro.get('geometry') for registro in registros_a_agregar], index=filas, crs = 'WGS 84')
+        for con_altitud in [True, False]:
+            puntos = nuevos_elementos.loc[geometry.isna() & pd.notna(nuevos_elementos.latitud) & (pd.notna(nuevos_elementos.altitud) == con_altitud)]
+            if len(puntos) > 0:
+                altitud = puntos.altitud.astype(float) if con_altitud else None
+                geometry.loc[puntos.index] = gpd.points_from_xy(puntos.longitud.astype(float), puntos.latitud.astype(float), altitud, crs = 'WGS 84')
+        nuevos_elementos = gpd.GeoDataFrame(nuevos_elementos, geometry=geometry, crs = 'WGS 84')[columnas]
+
+        # incorporar las filas a la tabla (reemplazando las filas de los archivos que ya existían)
+        if len(self.elementos) == 0:
+            self.elementos = nuevos_elementos
+        else:
+            elementos_anteriores = self.elementos.drop(index=[fila for fila in filas if fila in self.elementos.index])
+            self.elementos = pd.concat([elementos_anteriores, nuevos_elementos]).sort_index()
+        return True
 
-        altitud_media = 0
-        for punto in puntos:
-            altitud_media += punto[2] / len(puntos)
 
-        recorrido = LineString(puntos) 
-        return recorrido, altitud_inicial, altitud_media, velocidad
 
+    def leer_plan_de_vuelo(self, ruta_plan_de_vuelo):
+        # recorrido, altitud inicial, altitud media y velocidad del plan de vuelo (ver leer_archivo_waypoints)
+        return self.leer_geometria(ruta_plan_de_vuelo, leer_archivo_waypoints)
 
 
-    def fila_datos_poligono(self, fila_elemento):
-        archivo = self.elementos.loc[fila_elemento, 'archivo']
-        subcarpeta = self.elementos.loc[fila_elemento, 'subcarpeta']
-        ruta_archivo = os.path.join(self.carpeta, subcarpeta, archivo)
-        if archivo.endswith('.poly'):
-            geometry = self.leer_poligono(ruta_archivo)
-            self.elementos.loc[fila_elemento, 'latitud'] = geometry.centroid.xy[1][0]
-            self.elementos.loc[fila_elemento, 'longitud'] = geometry.centroid.xy[0][0]
-            self.elementos.loc[fila_elemento, 'geometry'] = geometry            
 
     def leer_poligono(self, ruta_poligono):
-        vertices = []
-        with open(ruta_poligono) as archivo:
-            for linea in archivo:
-                if not linea.startswith('#'):
-                    latitud, longitud = linea.split(" ")
-                    vertices.append([float(longitud), float(latitud)])
-        poligono = Polygon(vertices) 
-        return poligono
+        return self.leer_geometria(ruta_poligono, leer_archivo_poly)
+
+
+    def leer_geometria(self, ruta_archivo, lector):
+        # leer cada plan de vuelo o polígono una sola vez (mientras no se modifique el archivo), guardando el resultado según la ruta y la fecha de modificación
+        clave = (ruta_archivo, os.path.getmtime(ruta_archivo))
+        if clave not in self.geometrias_leidas:
+            self.geometrias_leidas[clave] = lector(ruta_archivo)
+        return self.geometrias_leidas[clave]
 
 
 
+    def extension_geografica(self):
+        # longitud y latitud mínimas y máximas de todos los elementos del vuelo (o None si ningún elemento tiene coordenadas)
+        if len(self.elementos) == 0:
+            return None
+        extension = self.elementos.geometry.total_bounds
+        if np.isnan(extension).any():
+            return None
+        return tuple(float(valor) for valor in extension)
+
+
     def actualizar_datos(self):
 
         nombre = self.info['nombre']
@@ -374,157 +1250,203 @@ class Vuelo:
         descripcion = self.info['descripcion']
         carpeta = self.info['carpeta']
         global version_bitacora
-        fecha = pd.NA
-        hora = pd.NA
-        superficie_cubierta = pd.NA
-        lista_imagenes = pd.NA
-        camara = pd.NA
-        exposicion = pd.NA
-        iso = pd.NA
-        latitud = pd.NA
-        longitud = pd.NA
-        altitud = pd.NA
-        altitud_de_vuelo = pd.NA
-        velocidad_de_vuelo = pd.NA
- 
-        # listar poligonos
-        poligonos = self.elementos.loc[self.elementos.tipo_archivo == 'polígono']
-        if len(poligonos)>1: poligono = ', '.join(poligonos.archivo.to_list())
-        elif len(poligonos)==1: poligono = poligonos.archivo.to_list()[0]
-        else: poligono = pd.NA
-        # tomar las coordenadas del polígono más reciente
-        if len(poligonos)>0:
-            geometry_poligono = poligonos.sort_values(by='datetime', ascending=False).geometry.to_list()[0]
-            latitud = geometry_poligono.centroid.y
-            longitud = geometry_poligono.centroid.x
 
+        # resumir los archivos de cada tipo (en el orden en que se registraron los tipos de archivo: 
+        # si dos tipos informan el mismo dato, por ejemplo las coordenadas, queda el del último)
+        datos = dict.fromkeys([
+            'fecha', 'hora', 'hora_despegue', 'hora_aterrizaje', 'tiempo_de_vuelo',
+            'registro_telemetria', 'poligono', 'plan_de_vuelo', 'altitud_de_vuelo', 'velocidad_de_vuelo',
+            'imagenes', 'cantidad_de_imagenes', 'superficie_cubierta', 'camara', 'iso', 'exposicion',
+            'mosaico', 'modelo_de_elevacion', 'latitud', 'longitud', 'altitud',
+        ], pd.NA)
+        for resumen in self.resumenes_por_tipo().values():
+            datos.update(resumen)
+
+        # localidad
+        localidad = pd.NA
+        if pd.notna(datos['latitud']) & pd.notna(datos['longitud']):
+            localidad = buscar_localidades([(datos['latitud'], datos['longitud'])])[0]
+
+        datos.update({
+            'nombre': nombre, 'descripcion': descripcion, 'localidad': localidad,
+            'carpeta': carpeta, 'idioma': idioma, 'version_bitacora': version_bitacora,
+        })
+
+        # guardar datos en la tabla self.info (dict)
+        for dato, valor in datos.items():
+            if pd.isna(valor): valor=''
+            self.info[dato] = valor
+
+
+    def resumenes_por_tipo(self):
+        '''
+        Resume los archivos de cada tipo con la función resumir de su TipoArchivo, volviendo a calcular sólo los resúmenes 
+        de los tipos que tuvieron cambios en la tabla de elementos desde la última vez (ver agregar_registros)
+
+        Returns
+        -------
+        resumenes
+            dict con el nombre de cada tipo de archivo como clave (en el orden en que se registraron los tipos) 
+            y como valor el dict con los datos del resumen
+        '''
+        tipos = [tipo for tipo in dict.fromkeys(TIPOS_ARCHIVO.values()) if tipo.resumir is not None]
+        pendientes = [tipo for tipo in tipos if tipo.nombre in self.tipos_modificados or tipo.nombre not in self.resumenes]
+        if pendientes:
+            # separar la tabla por tipo de archivo de una sola vez (cada grupo conserva el orden de la tabla)
+            filas_por_tipo = self.elementos.groupby('tipo_archivo', sort=False).indices if len(self.elementos) > 0 else {}
+            for tipo in pendientes:
+                grupo = self.elementos.iloc[filas_por_tipo.get(tipo.nombre, [])]
+                self.resumenes[tipo.nombre] = tipo.resumir(self, grupo)
+            self.tipos_modificados.clear()
+        return {tipo.nombre: self.resumenes[tipo.nombre] for tipo in tipos}
+
+
+    def resumen_poligonos(self, poligonos):
+        datos = {}
+        if len(poligonos)>0:
+            # listar poligonos
+            datos['poligono'] = ', '.join(poligonos.archivo)
+            # tomar las coordenadas del polígono más reciente
+            geometry_poligono = poligonos.geometry[poligonos.datetime.idxmax()]
+            if geometry_poligono is not None:
+                datos['latitud'] = geometry_poligono.centroid.y
+                datos['longitud'] = geometry_poligono.centroid.x
+        return datos
+
+
+    def resumen_planes_de_vuelo(self, planes):
+        datos = {}
         # listar planes de vuelo
-        planes = self.elementos.loc[self.elementos.tipo_archivo == 'plan de vuelo']
-        if len(planes)>1: plan_de_vuelo = ', '.join(planes.archivo.to_list())
-        elif len(planes)==1: plan_de_vuelo = planes.archivo.to_list()[0]
-        else: plan_de_vuelo = pd.NA
-        # tomar las coordenadas y datos de vuelo del plan de vuelo más reciente
+        if len(planes)>0: datos['plan_de_vuelo'] = ', '.join(planes.archivo)
+        # tomar las coordenadas y datos de vuelo del plan de vuelo más reciente (entre los que se pudieron leer)
+        planes = planes.loc[pd.notna(planes.geometry)]
         if len(planes)>0:
-            archivo_plan = planes.sort_values(by='datetime', ascending=False).archivo.to_list()[0]
-            subcarpeta_plan = planes.sort_values(by='datetime', ascending=False).subcarpeta.to_list()[0]
-            if archivo_plan.endswith('.waypoints'): 
-                ruta_archivo = os.path.join(self.carpeta, subcarpeta_plan, archivo_plan)
-                geometry, altitud_inicial, altitud_media, velocidad_de_vuelo = self.leer_plan_de_vuelo(ruta_archivo)
-                altitud_de_vuelo = altitud_media - altitud_inicial
-                altitud = altitud_inicial
-                latitud = geometry.centroid.y
-                longitud = geometry.centroid.x
-
-        # listar registros de telemetría
-        registros = self.elementos.loc[self.elementos.tipo_archivo == 'telemetría']
-        if len(registros)>1: registro_telemetria = ', '.join(registros.archivo.to_list())
-        elif len(registros)==1: registro_telemetria = registros.archivo.to_list()[0]
-        else: registro_telemetria = pd.NA
-        # tomar la fecha de la primera telemetría
+            mas_reciente = planes.datetime.idxmax()
+            archivo_plan = planes.archivo[mas_reciente]
+            subcarpeta_plan = planes.subcarpeta[mas_reciente]
+            ruta_archivo = os.path.join(self.carpeta, subcarpeta_plan, archivo_plan)
+            geometry, altitud_inicial, altitud_media, velocidad_de_vuelo = self.leer_plan_de_vuelo(ruta_archivo)
+            datos['altitud_de_vuelo'] = altitud_media - altitud_inicial
+            datos['velocidad_de_vuelo'] = velocidad_de_vuelo
+            datos['altitud'] = altitud_inicial
+            datos['latitud'] = geometry.centroid.y
+            datos['longitud'] = geometry.centroid.x
+        return datos
+
+
+    def resumen_registros_telemetria(self, registros):
+        datos = {}
         if len(registros)>0:
-            fecha = registros.sort_values(by='datetime').fecha.to_list()[0]
-            hora = registros.sort_values(by='datetime').hora.to_list()[0]
-
-        # imágenes (si hay imágenes georreferenciadas, usar sólo esas)
-        imagenes = self.elementos.loc[self.elementos.tipo_archivo=='imagen']
-        imagenes_georreferenciadas = imagenes.loc[pd.notna(imagenes.latitud)]
-        if len(imagenes_georreferenciadas) > 0:
-            imagenes = imagenes_georreferenciadas
+            # listar registros de telemetría
+            datos['registro_telemetria'] = ', '.join(registros.archivo)
+            # tomar la fecha de la primera telemetría
+            primero = registros.datetime.idxmin()
+            datos['fecha'] = registros.fecha[primero]
+            datos['hora'] = registros.hora[primero]
+        # horarios y tiempo de vuelo de los registros con posiciones válidas (sumando el tiempo de todos los registros)
+        if 'segundos_de_vuelo' in registros:
+            registros_con_posiciones = registros.loc[pd.notna(registros.segundos_de_vuelo)]
+            if len(registros_con_posiciones) > 0:
+                datos['hora_despegue'] = registros_con_posiciones.hora[registros_con_posiciones.datetime.idxmin()]
+                datos['hora_aterrizaje'] = registros_con_posiciones.hora_aterrizaje[registros_con_posiciones.datetime.idxmax()]
+                minutos, segundos = divmod(int(round(registros_con_posiciones.segundos_de_vuelo.astype(float).sum())), 60)
+                datos['tiempo_de_vuelo'] = '%02d:%02d' % (minutos, segundos)
+        return datos
+
+
+    def resumen_imagenes(self, imagenes):
+        datos = {}
+        # si hay imágenes georreferenciadas, usar sólo esas
+        georreferenciadas = pd.notna(imagenes.latitud)
+        if georreferenciadas.any():
+            imagenes = imagenes.loc[georreferenciadas]
         # cantidad de imágenes
-        cantidad_de_imagenes = len(imagenes)
-        if cantidad_de_imagenes > 0:
+        datos['cantidad_de_imagenes'] = len(imagenes)
+        if len(imagenes) > 0:
             #tomar la fecha y hora de la primera imagen
-            fecha = imagenes.sort_values(by='datetime').fecha.values[0]
-            hora = imagenes.sort_values(by='datetime').hora.values[0]
+            primera = imagenes.datetime.idxmin()
+            datos['fecha'] = imagenes.fecha[primera]
+            datos['hora'] = imagenes.hora[primera]
             # listar imágenes
             if len(imagenes) > 1:
-                lista_imagenes = imagenes.archivo.iloc[0] + ' - ' + imagenes.archivo.iloc[len(imagenes)-1]
-            elif len(imagenes) == 1:
-                lista_imagenes = imagenes.archivo.iloc[0]
+                datos['imagenes'] = imagenes.archivo.iloc[0] + ' - ' + imagenes.archivo.iloc[-1]
+            else:
+                datos['imagenes'] = imagenes.archivo.iloc[0]
             # datos de la cámara
-            camara = imagenes.camara.values[0]
-            exposicion = imagenes.exposicion.values[0]
-            iso = imagenes.iso.values[0]
+            datos['camara'] = imagenes.camara.iloc[0]
+            datos['exposicion'] = imagenes.exposicion.iloc[0]
+            datos['iso'] = imagenes.iso.iloc[0]
             # coordenadas promedio de las imágenes
-            latitud = imagenes.latitud.mean()
-            longitud = imagenes.longitud.mean()
-            altitud = imagenes.altitud.max()
-            # superficie cubierta por las imágenes
-            coordenadas = imagenes[['longitud', 'latitud']]
-            coordenadas = coordenadas.loc[(pd.notna(coordenadas.latitud)) & (pd.notna(coordenadas.longitud))] 
-            if len(coordenadas)>0: 
-                puntos = gpd.GeoSeries(gpd.tools.collect(gpd.points_from_xy(coordenadas.longitud, coordenadas.latitud, crs = 'WGS 84')), crs = 'WGS 84')
-                area_cubierta_escala_metros = puntos.convex_hull.to_crs(3857)
-                superficie_cubierta = area_cubierta_escala_metros.area[0]
-
-        # listar mosaicos ordenados por fecha (más reciente primero)
-        mosaicos = self.elementos.sort_values(by='datetime', ascending=False).loc[self.elementos.tipo_archivo == 'mosaico / dem']
-        # excluir los archivos que sean dsm o dtm
-        mosaicos = mosaicos.loc[~mosaicos['archivo'].str.endswith('dsm.tif')]
-        mosaicos = mosaicos.loc[~mosaicos['archivo'].str.endswith('dtm.tif')]
-        # separar y poner primero en la lista los que terminan en 'orthophoto.tif'
-        mosaicos_orthophoto_tif = mosaicos.loc[mosaicos['archivo'].str.endswith('orthophoto.tif')]
-        mosaicos_no_orthophoto_tif = mosaicos.loc[~mosaicos['archivo'].str.endswith('orthophoto.tif')]
-        mosaicos = pd.concat([mosaicos_orthophoto_tif, mosaicos_no_orthophoto_tif])
-        # listar mosaicos
-        if len(mosaicos)>1: mosaico = ', '.join(mosaicos.archivo.to_list())
-        elif len(mosaicos)==1: mosaico = mosaicos.archivo.to_list()[0]
-        else: mosaico = pd.NA
-
-        # listar dems/dtms ordenados por fecha (más reciente primero)
-        modelos_de_elevacion = self.elementos.sort_values(by='datetime', ascending=False).loc[self.elementos.tipo_archivo == 'mosaico / dem']
-        # dejar sólo los archivos que sean dsm o dtm
-        modelos_de_elevacion = modelos_de_elevacion.loc[(modelos_de_elevacion['archivo'].str.endswith('dsm.tif')) | (modelos_de_elevacion['archivo'].str.endswith('dtm.tif'))]
-        # listar dems/dtms
-        if len(modelos_de_elevacion)>1: modelo_de_elevacion = ', '.join(modelos_de_elevacion.archivo.to_list())
-        elif len(modelos_de_elevacion)==1: modelo_de_elevacion = modelos_de_elevacion.archivo.to_list()[0]
-        else: modelo_de_elevacion = pd.NA
-
-        # localidad
-        coordenadas = (latitud, longitud)
-        localidad = pd.NA
-        if pd.notna(latitud) & pd.notna(longitud):
-            localidad = reverse_geocoder.search(coordenadas, mode=1)[0]
-            pais = localidad['cc']
-            prov = localidad['admin1']
-            ciudad = localidad['name']
-            localidad = ciudad + ', ' + prov + ', ' + pais
-
-        lista_variables = [
-        'nombre', 'descripcion', 'localidad',
-        'carpeta', 
-        'fecha', 'hora', 
-        'registro_telemetria', 'poligono', 
-        'plan_de_vuelo', 'altitud_de_vuelo', 'velocidad_de_vuelo', 
-        'imagenes', 'cantidad_de_imagenes', 'superficie_cubierta',
-        'camara', 'iso', 'exposicion', 
-        'mosaico', 'modelo_de_elevacion',
-        'latitud', 'longitud', 'altitud', 
-        'idioma', 'version_bitacora'
-        ]
-        lista_valores = [
-        nombre, descripcion, localidad,
-        carpeta, 
-        fecha, hora, 
-        registro_telemetria, poligono, 
-        plan_de_vuelo, altitud_de_vuelo, velocidad_de_vuelo,
-        lista_imagenes, cantidad_de_imagenes, superficie_cubierta,
-        camara, iso, exposicion, 
-        mosaico, modelo_de_elevacion,
-        latitud, longitud, altitud, 
-        idioma, version_bitacora
-        ]
-
-        # guardar datos en la tabla self.info (dict)
-        for dato, valor in zip(lista_variables, lista_valores):
-            if pd.isna(valor): valor=''
-            self.info[dato] = valor
-
+            datos['latitud'] = imagenes.latitud.mean()
+            datos['longitud'] = imagenes.longitud.mean()
+            datos['altitud'] = imagenes.altitud.max()
+            # superficie cubierta por las imágenes (envolvente convexa de todos los puntos, calculada de una vez, y luego convertida a metros)
+            coordenadas = imagenes.loc[pd.notna(imagenes.latitud) & pd.notna(imagenes.longitud), ['longitud', 'latitud']]
+            if len(coordenadas) > 0:
+                coordenadas = coordenadas.to_numpy(dtype=float)
+                envolvente = geometria.MultiPoint(coordenadas).convex_hull
+                area_cubierta_escala_metros = gpd.GeoSeries([envolvente], crs = 'WGS 84').to_crs(3857)
+                datos['superficie_cubierta'] = area_cubierta_escala_metros.area[0]
+        return datos
+
+
+    def resumen_mosaicos(self, mosaicos):
+        datos = {}
+        # ordenar por fecha (más reciente primero)
+        mosaicos = mosaicos.sort_values(by='datetime', ascending=False)
+        # separar los dsm/dtm de los mosaicos, y poner primero en la lista los que terminan en 'orthophoto.tif'
+        nombres = mosaicos['archivo'].str
+        es_modelo_de_elevacion = nombres.endswith(('dsm.tif', 'dtm.tif'))
+        es_orthophoto = nombres.endswith('orthophoto.tif')
+        lista_mosaicos = pd.concat([mosaicos.archivo[es_orthophoto], mosaicos.archivo[~es_orthophoto & ~es_modelo_de_elevacion]])
+        # listar mosaicos y dems/dtms
+        if len(lista_mosaicos)>0: datos['mosaico'] = ', '.join(lista_mosaicos)
+        if es_modelo_de_elevacion.any(): datos['modelo_de_elevacion'] = ', '.join(mosaicos.archivo[es_modelo_de_elevacion])
+        return datos
+
+    def crear_mapa(self, tamanio=7, mosaico=True, imagenes=True, poligono=True, plan_de_vuelo=True, telemetria=True, calidad='exportar', tamanio_vista_previa=None, cancelar=None):
+        '''
+        Crea la imagen del mapa del vuelo (self.mapa)
 
-    def crear_mapa(self, tamanio=7, mosaico=True, imagenes=True, poligono=True, plan_de_vuelo=True):
+        Parameters
+        ----------
+        tamanio : float, default=7
+            Tamaño del mapa (el mapa tiene tamanio*100 pixels de lado)
+        mosaico, imagenes, poligono, plan_de_vuelo, telemetria : bool, default=True
+            Elementos a mostrar en el mapa (si se muestra el mosaico, no se muestran los demás elementos)
+        calidad : {'exportar', 'vista_previa'}, default='exportar'
+            'exportar' dibuja el mapa al doble de la resolución y luego lo reduce (para guardarlo en bitacora.png), 
+            'vista_previa' lo dibuja directamente al tamaño final (más rápido, para mostrarlo en pantalla)
+        tamanio_vista_previa : int, optional
+            Tamaño en pixels de la vista previa (por defecto, tamanio*100)
+        cancelar : threading.Event, optional
+            Evento para cancelar la creación del mapa: si se activa, se produce VueloCancelado antes de leer el mosaico 
+            o antes de dibujar el mapa, sin modificar self.mapa
+        '''
 
-        # crear figura
-        fig, ax = plt.subplots(1, figsize=(tamanio, tamanio), dpi=200)  # crear imagen al doble de la resolución, para luego reducirla
+        def revisar_cancelacion():
+            if cancelar is not None and cancelar.is_set():
+                raise VueloCancelado()
+
+        # guardar las opciones, para poder crear luego el mapa con calidad de exportación si se creó como vista previa
+        self.calidad_mapa = calidad
+        self.opciones_mapa = dict(tamanio=tamanio, mosaico=mosaico, imagenes=imagenes, poligono=poligono, plan_de_vuelo=plan_de_vuelo, telemetria=telemetria)
+
+        # crear figura (sin usar pyplot, para que la figura no quede abierta luego de crear el mapa)
+        import matplotlib
+        # usar un 'backend' apropiado para crear el mapa en formato png (geopandas usa pyplot para dibujar)
+        matplotlib.use('Agg')
+        import matplotlib.figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        if calidad == 'exportar':
+            dpi = 200   # crear imagen al doble de la resolución, para luego reducirla
+        elif tamanio_vista_previa is not None:
+            dpi = tamanio_vista_previa / tamanio
+        else:
+            dpi = 100
+        fig = matplotlib.figure.Figure(figsize=(tamanio, tamanio), dpi=dpi)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot(1, 1, 1)
         ax.set_axis_off()
 
         if mosaico:
@@ -541,7 +1463,8 @@ class Vuelo:
                 archivo_mosaico = mosaicos.archivo.to_list()[0]
                 subcarpeta_mosaico = mosaicos.subcarpeta.to_list()[0]
                 path = os.path.join(self.carpeta, subcarpeta_mosaico, archivo_mosaico)
-                self.agregar_mosaico_al_mapa(ax, path)
+                revisar_cancelacion()
+                self.agregar_mosaico_al_mapa(ax, path, tamanio_pixeles=int(tamanio*dpi))
             else:
                 # si no se encontró un mosaico/dem para mostrar, habilitar a que se muestre la demás información
                 mosaico = False
@@ -565,71 +1488,138 @@ class Vuelo:
                 mosaico = False
             '''
 
-        # si no se muestra el mosaico, mostrar polígono, plan de vuelo e imágenes
+        # si no se muestra el mosaico, mostrar polígono, plan de vuelo, telemetría e imágenes
+        # (cada capa se dibuja de una sola vez a partir de la columna de geometrías, como una única colección de Matplotlib)
+        geometrias = self.elementos.geometry
+        con_geometria = pd.notna(geometrias)
+
         if poligono and not mosaico:
-            poligonos = self.elementos.loc[self.elementos.tipo_archivo == 'polígono']
-            for i, elemento in poligonos.iterrows():
-                puntos_poligono = elemento['geometry']
-                if pd.notna(puntos_poligono):
-                    poligono = gpd.GeoSeries(puntos_poligono, crs = 'WGS 84')
-                    poligono.plot(ax=ax, color='#d40000', alpha=0.1, zorder=2)
+            poligonos = geometrias.loc[(self.elementos.tipo_archivo == 'polígono') & con_geometria]
+            if len(poligonos) > 0:
+                poligonos.plot(ax=ax, color='#d40000', alpha=0.1, zorder=2)
 
         if plan_de_vuelo and not mosaico:
-            planes = self.elementos.loc[self.elementos.tipo_archivo == 'plan de vuelo']
-            for i, elemento in planes.iterrows():
-                puntos_plan_de_vuelo = elemento['geometry']
-                if pd.notna(puntos_plan_de_vuelo):
-                    plan_de_vuelo = gpd.GeoSeries(puntos_plan_de_vuelo, crs = 'WGS 84')
-                    plan_de_vuelo.plot(ax=ax, color='#d40000', alpha=0.4, linewidth=tamanio*1, linestyle='dashed', capstyle='round', zorder=3)
+            planes = geometrias.loc[(self.elementos.tipo_archivo == 'plan de vuelo') & con_geometria]
+            if len(planes) > 0:
+                planes.plot(ax=ax, color='#d40000', alpha=0.4, linewidth=tamanio*1, linestyle='dashed', capstyle='round', zorder=3)
+
+        if telemetria and not mosaico:
+            recorridos = geometrias.loc[(self.elementos.tipo_archivo == 'telemetría') & con_geometria]
+            if len(recorridos) > 0:
+                recorridos.plot(ax=ax, color='#ff9900', alpha=0.8, linewidth=tamanio*0.4, linestyle='solid', capstyle='round', zorder=4)
 
         if imagenes and not mosaico:
-            imagenes_con_coordenadas = self.elementos.loc[(self.elementos.tipo_archivo=='imagen') & (pd.notna(self.elementos.geometry))]
+            imagenes_con_coordenadas = self.elementos.loc[(self.elementos.tipo_archivo=='imagen') & con_geometria]
             if len(imagenes_con_coordenadas) > 0:
-                puntos_imagenes = gpd.GeoSeries(gpd.tools.collect(gpd.points_from_xy(imagenes_con_coordenadas.longitud, imagenes_con_coordenadas.latitud, crs = 'WGS 84')), crs = 'WGS 84')
-                puntos_imagenes = puntos_imagenes.values
-                imagenes = gpd.GeoSeries(puntos_imagenes, crs = 'WGS 84')
-                imagenes.plot(ax=ax, color='#5599ff', alpha=0.9, markersize=tamanio*tamanio*2.5, linewidth=0, zorder=5)
-                linea_recorrido = LineString(gpd.points_from_xy(imagenes_con_coordenadas.longitud, imagenes_con_coordenadas.latitud, crs = 'WGS 84'))
-                recorrido = gpd.GeoSeries(linea_recorrido, crs = 'WGS 84')
-                recorrido.plot(ax=ax, color='#5599ff', alpha=0.9, linewidth=tamanio*0.6, linestyle='solid', capstyle='round', zorder=4)
-                
-
-        # crear y luego borrar una imagen png temporal del mapa (evita algunos errores de origen desconocido)
-        ruta_programa = inspect.getframeinfo(inspect.currentframe()).filename
-        ruta_archivo_temporal = os.path.join(os.environ['TEMP'], '_temp.png')
-        fig.savefig(ruta_archivo_temporal)
-        os.remove(ruta_archivo_temporal)
-
-        # transformar la figura Matplotlib a una imagen Pillow y guardarla
-        imagen_mapa = Image.frombytes('RGB', fig.canvas.get_width_height(),fig.canvas.tostring_rgb()).resize((int(tamanio*100),int(tamanio*100)), Image.ANTIALIAS)
-        self.mapa = imagen_mapa
-
-    def agregar_mosaico_al_mapa(self, ax, ruta_archivo):
+                longitudes = imagenes_con_coordenadas.longitud.to_numpy(dtype=float)
+                latitudes = imagenes_con_coordenadas.latitud.to_numpy(dtype=float)
+                puntos_imagenes = gpd.GeoSeries(gpd.points_from_xy(longitudes, latitudes), crs = 'WGS 84')
+                puntos_imagenes.plot(ax=ax, color='#5599ff', alpha=0.9, markersize=tamanio*tamanio*2.5, linewidth=0, zorder=5)
+                if len(imagenes_con_coordenadas) > 1:
+                    recorrido = gpd.GeoSeries([geometria.LineString(np.column_stack((longitudes, latitudes)))], crs = 'WGS 84')
+                    recorrido.plot(ax=ax, color='#5599ff', alpha=0.9, linewidth=tamanio*0.6, linestyle='solid', capstyle='round', zorder=4)
+
+        # dibujar la figura y transformarla en una imagen Pillow, usando directamente la memoria de la figura
+        revisar_cancelacion()
+        canvas.draw()
+        pixels = canvas.buffer_rgba()
+        alto, ancho = pixels.shape[:2]
+        imagen_mapa = Image.frombuffer('RGBA', (ancho, alto), pixels, 'raw', 'RGBA', 0, 1)
+        if calidad == 'exportar':
+            imagen_mapa = imagen_mapa.resize((int(tamanio*100),int(tamanio*100)), Image.LANCZOS)
+        self.mapa = imagen_mapa.convert('RGB')
+        # liberar la figura
+        fig.clear()
+
+    def agregar_mosaico_al_mapa(self, ax, ruta_archivo, tamanio_pixeles=None):
+        '''
+        Muestra el mosaico o modelo de elevación en el mapa
+
+        Parameters
+        ----------
+        ax : matplotlib.axes.Axes
+            Ejes del mapa
+        ruta_archivo : str
+            Ruta completa del archivo geotiff
+        tamanio_pixeles : int, optional
+            Tamaño en pixels del mapa: el mosaico se lee con esa resolución (usando las vistas generales/overviews del archivo si existen), 
+            para no cargar en memoria el archivo completo. Si no se especifica, se lee con la resolución original
+        '''
+        # buscar el mosaico ya reducido en la memoria caché (si el archivo no cambió desde que se guardó)
+        estado = os.stat(ruta_archivo)
+        clave = '|'.join([os.path.abspath(ruta_archivo), str(estado.st_size), str(estado.st_mtime), str(tamanio_pixeles)])
+        ruta_cache = os.path.join(carpeta_cache('mosaicos'), hashlib.sha1(clave.encode('utf-8')).hexdigest() + '.npy')
+        datos_mosaico_stack = None
+        if os.path.exists(ruta_cache):
+            try:
+                datos_mosaico_stack = np.load(ruta_cache)
+                os.utime(ruta_cache)    # marcar como usado recientemente
+            except (OSError, ValueError):
+                datos_mosaico_stack = None
+        # si no está en la memoria caché, leer el archivo y guardarlo
+        if datos_mosaico_stack is None:
+            datos_mosaico_stack = self.leer_mosaico(ruta_archivo, tamanio_pixeles)
+            try:
+                with open(ruta_cache + '.tmp', 'wb') as archivo_cache:
+                    np.save(archivo_cache, datos_mosaico_stack)
+                os.replace(ruta_cache + '.tmp', ruta_cache)
+                limpiar_cache(carpeta_cache('mosaicos'), TAMANIO_MAXIMO_CACHE_MOSAICOS)
+            except OSError:
+                pass
+        # mostrar el mosaico en la figura
+        ax.imshow(datos_mosaico_stack, cmap='Greys')
+
+
+    def leer_mosaico(self, ruta_archivo, tamanio_pixeles=None):
+        # leer el mosaico con la resolución indicada (ver agregar_mosaico_al_mapa)
         # leer archivo de mosaico
+        from osgeo import gdal
         datos_mosaico = gdal.Open(ruta_archivo, gdal.GA_ReadOnly)
+        ancho, alto = datos_mosaico.RasterXSize, datos_mosaico.RasterYSize
+        # tamaño con el que se va a leer el mosaico (manteniendo la relación de aspecto)
+        factor = 1
+        if tamanio_pixeles is not None:
+            factor = max(1, max(ancho, alto) / tamanio_pixeles)
+        ancho_lectura = max(1, int(round(ancho / factor)))
+        alto_lectura = max(1, int(round(alto / factor)))
         # procesar cada banda individual
         bandas_mosaico = datos_mosaico.RasterCount
+        datos_mosaico_stack = None
         for i in range(1, bandas_mosaico+1):
             # leer banda
             banda_mosaico = datos_mosaico.GetRasterBand(i)
-            datos_mosaico_banda = banda_mosaico.ReadAsArray()
-            # cambiar los valores 'no data' por nan
+            # usar la vista general (overview) de menor resolución que tenga al menos el tamaño de lectura
+            banda_lectura = banda_mosaico
+            for j in range(banda_mosaico.GetOverviewCount()):
+                vista_general = banda_mosaico.GetOverview(j)
+                if vista_general.XSize >= ancho_lectura and vista_general.YSize >= alto_lectura and vista_general.XSize < banda_lectura.XSize:
+                    banda_lectura = vista_general
+            # leer la banda directamente al tamaño de lectura (sin cargar la resolución completa)
+            datos_mosaico_banda = banda_lectura.ReadAsArray(0, 0, banda_lectura.XSize, banda_lectura.YSize, buf_xsize=ancho_lectura, buf_ysize=alto_lectura)
+            # cambiar los valores 'no data' por nan (sólo es posible en bandas con valores decimales)
             ndval = banda_mosaico.GetNoDataValue()
-            if ndval!=None:
+            if ndval!=None and np.issubdtype(datos_mosaico_banda.dtype, np.floating):
                 datos_mosaico_banda[datos_mosaico_banda==ndval] = np.nan
             # agrupar las bandas en un stack
-            if i==1:
+            if bandas_mosaico==1:
                 datos_mosaico_stack = datos_mosaico_banda
             else:
-                datos_mosaico_stack = np.dstack((datos_mosaico_stack, datos_mosaico_banda))
-        # mostrar el mosaico en la figura
-        ax.imshow(datos_mosaico_stack, cmap='Greys')
+                if datos_mosaico_stack is None:
+                    datos_mosaico_stack = np.empty((alto_lectura, ancho_lectura, bandas_mosaico), dtype=datos_mosaico_banda.dtype)
+                datos_mosaico_stack[:, :, i-1] = datos_mosaico_banda
+        return datos_mosaico_stack
 
 
 
     def guardar_png(self): #, fig):
         #fig.save(os.path.join(self.carpeta, 'bitacora.png'), 'PNG')
-        self.mapa.save(os.path.join(self.carpeta, 'bitacora.png'), 'PNG')
+        # si el mapa se creó como vista previa, crearlo nuevamente con calidad de exportación
+        if self.calidad_mapa == 'vista_previa':
+            self.crear_mapa(calidad='exportar', **self.opciones_mapa)
+        # guardar en un archivo temporal y luego reemplazar el anterior, para no dejar archivos incompletos si se interrumpe
+        ruta = os.path.join(self.carpeta, self.bitacora_png)
+        self.mapa.save(ruta + '.tmp', 'PNG')
+        os.replace(ruta + '.tmp', ruta)
 
 
     def guardar_csv(self) -> None:
@@ -643,94 +1633,744 @@ class Vuelo:
         # elegir el idioma en el que se guardan los nombres de las variables en la tabla
         idioma = self.info['idioma']
         dataframe_csv = dataframe_csv[['id', idioma, 'valor']]
-        # guardar la tabla
-        dataframe_csv.to_csv(ruta, index=False, header=False)
+        # guardar la tabla (en un archivo temporal que luego reemplaza al anterior)
+        dataframe_csv.to_csv(ruta + '.tmp', index=False, header=False)
+        os.replace(ruta + '.tmp', ruta)
 
 
     def guardar_kml(self) -> None:
+        # guardar los elementos del vuelo en formato kml 
+        # (el texto se arma por columnas para todos los elementos a la vez, y se escribe de una sola vez en un archivo temporal que luego reemplaza al anterior)
+        nombre_kml = os.path.join(self.carpeta, self.bitacora_kml)
+        with open(nombre_kml + '.tmp', 'w') as output:
+            output.write(self.texto_kml())
+        os.replace(nombre_kml + '.tmp', nombre_kml)
+
+
+    def guardar_kmz(self, procesos=None) -> None:
+        '''
+        Guarda bitacora.kmz: el kml del vuelo junto con miniaturas de las imágenes en un solo archivo comprimido, 
+        para verlo en Google Earth sin abrir las imágenes originales ni depender de la ubicación de la carpeta
+
+        Parameters
+        ----------
+        procesos : int or None, default=None
+            Cantidad de procesos en paralelo para crear las miniaturas (None: uno por núcleo del procesador)
+        '''
+        # miniaturas de las imágenes con coordenadas (con un nombre único dentro del kmz para cada imagen, aunque estén en distintas subcarpetas)
+        imagenes = self.elementos.loc[(self.elementos.tipo_archivo == 'imagen') & (pd.notna(self.elementos.geometry))]
+        rutas_imagenes = [os.path.join(self.carpeta, subcarpeta, archivo) for subcarpeta, archivo in zip(imagenes.subcarpeta, imagenes.archivo)]
+        nombres_miniaturas = ['miniaturas/' + hashlib.sha1(os.path.relpath(ruta, self.carpeta).encode('utf-8')).hexdigest()[:16] + '.jpg' for ruta in rutas_imagenes]
+        rutas_miniaturas = miniaturas_imagenes(rutas_imagenes, procesos=procesos)
+        # kml con enlaces a las miniaturas dentro del kmz
+        texto = self.texto_kml(enlaces_imagenes=pd.Series(nombres_miniaturas, index=imagenes.index, dtype=object))
+        # guardar en un archivo temporal y luego reemplazar el anterior (las miniaturas ya están comprimidas, por lo que se guardan sin comprimir)
+        ruta = os.path.join(self.carpeta, self.bitacora_kmz)
+        with ZipFile(ruta + '.tmp', 'w') as kmz:
+            kmz.writestr('doc.kml', texto.encode('utf-8'), compress_type=ZIP_DEFLATED)
+            for nombre_miniatura, ruta_miniatura in zip(nombres_miniaturas, rutas_miniaturas):
+                if ruta_miniatura is not None:
+                    kmz.write(ruta_miniatura, nombre_miniatura, compress_type=ZIP_STORED)
+        os.replace(ruta + '.tmp', ruta)
+
+
+    def texto_kml(self, enlaces_imagenes=None) -> str:
+        '''
+        Arma el contenido del archivo kml con los elementos del vuelo
+
+        Parameters
+        ----------
+        enlaces_imagenes : pandas.Series, optional
+            Enlace a la imagen que se muestra al hacer clic en cada imagen (con el mismo índice que la tabla de elementos), 
+            por defecto la ruta completa de la imagen original
+
+        Returns
+        -------
+        texto
+            str con el documento kml
+        '''
+        # encabezado del documento
+        partes = [
+            '<?xml version="1.0" encoding="utf-8" ?>\n',
+            '<kml xmlns="http://www.opengis.net/kml/2.2">\n',
+            '<Document>\n',
+            '<name>' + self.info['nombre'] + '</name>\n\n\n',
+        ]
+
+        # tipos de archivo a exportar (sólo los elementos con coordenadas)
+        tipos_archivo = ['plan de vuelo', 'telemetría', 'polígono', 'imagen']
+        for tipo_archivo in tipos_archivo:
+            elementos = self.elementos.loc[(self.elementos.tipo_archivo == tipo_archivo) & (pd.notna(self.elementos.geometry))]
+            if len(elementos) == 0:
+                continue
+
+            # datos de cada archivo
+            if tipo_archivo=='imagen':
+                lista_variables = ['archivo','subcarpeta','tamanio','fecha','hora','latitud','longitud','altitud','camara','exposicion','iso']
+            elif tipo_archivo=='telemetría':
+                lista_variables = ['archivo','subcarpeta','tamanio','fecha','hora','hora_aterrizaje','altitud_maxima','velocidad_maxima']
+            else:
+                lista_variables = ['archivo','subcarpeta','tamanio']
+            placemarks = '    <Placemark>\n      <name>' + elementos.archivo.map(str) + '</name>\n      <ExtendedData>\n'
+            for dato in lista_variables:
+                placemarks = placemarks + '        <Data name="' + dato + '">\n          <value>' + elementos[dato].map(str) + '</value>\n        </Data>\n'
+            placemarks = placemarks + '      </ExtendedData>\n'
+
+            # geometría de cada archivo
+            if tipo_archivo=='imagen':
+                # link para mostrar la imagen al hacer clic
+                if enlaces_imagenes is None:
+                    enlaces = pd.Series([os.path.join(self.carpeta, subcarpeta, archivo) for subcarpeta, archivo in zip(elementos.subcarpeta, elementos.archivo)], index=elementos.index)
+                    enlaces = 'file:///' + enlaces
+                else:
+                    enlaces = enlaces_imagenes.loc[elementos.index]
+                placemarks = (placemarks 
+                    + "      <description><![CDATA[<img src='" + enlaces + "'  width='200' />]]> </description>\n"
+                    # estilo del icono (que no muestre el nombre de todas las imágenes)
+                    + '      <Style>\n'
+                    + '        <IconStyle><Icon><href>http://maps.google.com/mapfiles/kml/shapes/placemark_square.png</href></Icon></IconStyle>\n'
+                    + '        <LabelStyle><scale>0</scale></LabelStyle>\n'
+                    + '      </Style>\n'
+                    # coordenadas de la imagen
+                    + '      <Point><coordinates>\n'
+                    + '          ' + elementos.longitud.map(str) + ',' + elementos.latitud.map(str) + ',' + elementos.altitud.map(str) + '\n'
+                    + '      </coordinates><altitudeMode>clampToGround</altitudeMode></Point>\n')
+            if tipo_archivo=='plan de vuelo':
+                # línea del plan de vuelo (color de línea amarillo 80%)
+                coordenadas = pd.Series([coordenadas_kml(geometria_plan.coords) for geometria_plan in elementos.geometry], index=elementos.index)
+                placemarks = (placemarks 
+                    + '    <Style><LineStyle><color>cc15f8ff</color><width>8</width></LineStyle></Style>\n'
+                    + '      <MultiGeometry><LineString><coordinates>\n'
+                    + coordenadas
+                    + '      </coordinates></LineString></MultiGeometry>\n')
+            if tipo_archivo=='telemetría':
+                # recorrido registrado por el dron (color de línea naranja 80%)
+                coordenadas = pd.Series([coordenadas_kml(recorrido.coords) for recorrido in elementos.geometry], index=elementos.index)
+                placemarks = (placemarks 
+                    + '    <Style><LineStyle><color>cc0099ff</color><width>4</width></LineStyle></Style>\n'
+                    + '      <MultiGeometry><LineString><coordinates>\n'
+                    + coordenadas
+                    + '      </coordinates></LineString></MultiGeometry>\n')
+            if tipo_archivo=='polígono':
+                # área del polígono (color de relleno rojo 20%)
+                coordenadas = pd.Series([coordenadas_kml(geometria_poligono.exterior.coords) for geometria_poligono in elementos.geometry], index=elementos.index)
+                placemarks = (placemarks 
+                    + '    <Style><PolyStyle><color>330b07e8</color><width>8</width><fill>1</fill><outline>0</outline></PolyStyle></Style>\n'
+                    + '      <MultiGeometry><Polygon><outerBoundaryIs><LinearRing><coordinates>\n'
+                    + coordenadas
+                    + '      </coordinates></LinearRing></outerBoundaryIs></Polygon></MultiGeometry>\n')
+            placemarks = placemarks + '    </Placemark>\n'
+
+            # carpeta con los elementos del tipo de archivo
+            partes.append('  <Folder><name>' + tipo_archivo + '</name>\n')
+            partes.extend(placemarks.tolist())
+            partes.append('  </Folder>\n\n\n')
+
+        # fin del archivo kml
+        partes.append('</Document>\n')
+        partes.append('</kml>\n')
+        return ''.join(partes)
+
+
+
+
+
+###################
+# TIPOS DE ARCHIVO
+# (para agregar un nuevo formato, se crea un TipoArchivo con sus funciones y se registra con registrar_tipo_archivo)
+
+
+class TipoArchivo:
+    '''
+    Lector de un tipo de archivo: extensiones que le corresponden, y funciones para reconocer el archivo, extraer sus datos 
+    y resumirlos en la información del vuelo
+
+    Parameters
+    ----------
+    nombre : str
+        Nombre del tipo de archivo (el que figura en la columna tipo_archivo de la tabla de elementos)
+    extensiones : list of str
+        Extensiones de los archivos de este tipo (en minúsculas, con el punto)
+    extraer : callable, optional
+        Función que recibe la ruta completa del archivo y el vuelo, y devuelve un dict con los datos a incorporar a la tabla de elementos
+        (si no se indica, sólo se incorporan los datos básicos del archivo)
+    resumir : callable, optional
+        Función que recibe el vuelo y las filas de la tabla de elementos de este tipo, y devuelve un dict con los datos a incorporar a vuelo.info
+    firmas : list of bytes, optional
+        Comienzos válidos del archivo: si el archivo no comienza con ninguno, no se extraen sus datos (por defecto, no se verifica)
+    modulos : list of str, optional
+        Módulos que necesita extraer, que se importan recién la primera vez que se lee un archivo de este tipo
+    paralelo : bool, default=False
+        Define si extraer puede ejecutarse en procesos paralelos (si no utiliza el vuelo, que en ese caso recibe como None)
+    '''
+
+    def __init__(self, nombre, extensiones, extraer=None, resumir=None, firmas=(), modulos=(), paralelo=False) -> None:
+        self.nombre = nombre
+        self.extensiones = extensiones
+        self.extraer = extraer
+        self.resumir = resumir
+        self.firmas = tuple(firmas)
+        self.modulos = modulos
+        self.paralelo = paralelo
+        self.modulos_cargados = False
+
+    def reconocer(self, ruta_archivo) -> bool:
+        # verificar sólo los primeros bytes del archivo
+        if not self.firmas:
+            return True
+        try:
+            with open(ruta_archivo, 'rb') as archivo:
+                return archivo.read(max(len(firma) for firma in self.firmas)).startswith(self.firmas)
+        except OSError:
+            return False
+
+    def leer(self, vuelo, ruta_archivo):
+        # datos propios del archivo (dict vacío si el tipo no tiene función para extraerlos o el archivo no se reconoce)
+        if self.extraer is None or not self.reconocer(ruta_archivo):
+            return {}
+        if not self.modulos_cargados:
+            for modulo in self.modulos:
+                importlib.import_module(modulo)
+            self.modulos_cargados = True
+        return self.extraer(ruta_archivo, vuelo)
+
+
+# tipo de archivo correspondiente a cada extensión
+TIPOS_ARCHIVO = {}
+
+
+def registrar_tipo_archivo(tipo):
+    # los resúmenes de los tipos de archivo se aplican en el orden en que se registran (si dos tipos informan el mismo dato, queda el del último)
+    for extension in tipo.extensiones:
+        TIPOS_ARCHIVO[extension] = tipo
+
+
+def leer_archivo(ruta_archivo):
+    # datos propios de un archivo que no necesita los datos del vuelo (para ejecutar en procesos paralelos)
+    tipo = TIPOS_ARCHIVO.get(os.path.splitext(ruta_archivo)[1].lower())
+    return tipo.leer(None, ruta_archivo) if tipo is not None else {}
+
+
+def datos_imagen(ruta_archivo, vuelo=None):
+    # datos EXIF de la imagen (no utiliza el vuelo, por lo que puede ejecutarse en un proceso paralelo)
+    return leer_datos_imagen(ruta_archivo)
+
+
+def datos_telemetria(ruta_archivo, vuelo=None):
+    # recorrido, horarios, altitud y velocidad a partir de los mensajes MAVLink del registro
+    try:
+        datos = resumen_telemetria(leer_telemetria(ruta_archivo))
+    except (ValueError, OverflowError, OSError):
+        # registro dañado: no detener la importación del resto de la carpeta
+        datos = {}
+    if 'datetime' not in datos:
+        # si el registro no tiene posiciones válidas, obtener fecha y hora del nombre de archivo
+        archivo = os.path.basename(ruta_archivo)
+        fecha = archivo[:10]
+        hora = archivo[11:19].replace('-',':')
+        datos['datetime'] = pd.to_datetime(fecha + ' ' + hora)
+    return datos
+
+
+def datos_plan_de_vuelo(ruta_archivo, vuelo):
+    # recorrido del plan de vuelo .waypoints (leído una sola vez por vuelo, ver Vuelo.leer_geometria)
+    datos = {}
+    geometry, altitud_inicial, altitud_media, velocidad_de_vuelo = vuelo.leer_plan_de_vuelo(ruta_archivo)
+    if geometry is not None:
+        datos['latitud'] = geometry.centroid.xy[1][0]
+        datos['longitud'] = geometry.centroid.xy[0][0]
+        datos['altitud'] = altitud_inicial
+        datos['geometry'] = geometry
+    return datos
+
+
+def datos_poligono(ruta_archivo, vuelo):
+    # contorno del polígono .poly (leído una sola vez por vuelo, ver Vuelo.leer_geometria)
+    datos = {}
+    geometry = vuelo.leer_poligono(ruta_archivo)
+    if geometry is not None:
+        datos['latitud'] = geometry.centroid.xy[1][0]
+        datos['longitud'] = geometry.centroid.xy[0][0]
+        datos['geometry'] = geometry
+    return datos
+
+
+registrar_tipo_archivo(TipoArchivo('polígono', ['.poly'], 
+    extraer=datos_poligono, resumir=Vuelo.resumen_poligonos, modulos=['shapely.geometry']))
+registrar_tipo_archivo(TipoArchivo('plan de vuelo', ['.waypoints'], 
+    extraer=datos_plan_de_vuelo, resumir=Vuelo.resumen_planes_de_vuelo, firmas=[b'QGC WPL'], modulos=['shapely.geometry']))
+# los planes de vuelo .grid se listan junto con los .waypoints (su resumen es el de 'plan de vuelo'), pero no se leen sus datos
+registrar_tipo_archivo(TipoArchivo('plan de vuelo', ['.grid']))
+registrar_tipo_archivo(TipoArchivo('telemetría', ['.tlog'], 
+    extraer=datos_telemetria, resumir=Vuelo.resumen_registros_telemetria, modulos=['shapely.geometry']))
+registrar_tipo_archivo(TipoArchivo('imagen', ['.jpg', '.jpeg'], 
+    extraer=datos_imagen, resumir=Vuelo.resumen_imagenes, paralelo=True))
+registrar_tipo_archivo(TipoArchivo('mosaico / dem', ['.tif', '.tiff'], 
+    resumir=Vuelo.resumen_mosaicos))
+
+
+
+
+
+###################
+# ARCHIVOS DEL PROGRAMA Y LISTA DE VUELOS
+
+
+def preparar_carpeta_archivos_bitacora():
+    '''
+    Devuelve la carpeta en "Documentos" con los archivos de bitacora (para que puedan ser modificados sin permisos de Administrador), 
+    creándola y copiándole los archivos originales si no existe
+    '''
+    # localización del programa
+    ruta_programa = inspect.getframeinfo(inspect.currentframe()).filename
+    carpeta_programa = os.path.dirname(os.path.abspath(ruta_programa))
+    carpeta_original_archivos_bitacora = os.path.join(carpeta_programa, 'bitacora_archivos')
+    try:
+        from win32com.shell import shell, shellcon
+        carpeta_documentos = shell.SHGetFolderPath(0, shellcon.CSIDL_PERSONAL, None, 0)
+    except ImportError:
+        # fuera de Windows
+        carpeta_documentos = os.path.join(os.path.expanduser('~'), 'Documents')
+    carpeta_archivos_bitacora = os.path.join(carpeta_documentos, 'bitacora_archivos')
+    # si no existe la carpeta, crearla y copiarle los archivos originales
+    if not os.path.exists(carpeta_archivos_bitacora):
+        os.makedirs(carpeta_archivos_bitacora)
+        archivos_a_copiar = ('bitacora.ini', 'vuelos.csv', 'textos_interfaz.xlsx')
+        for archivo in archivos_a_copiar:
+            shutil.copy2(os.path.join(carpeta_original_archivos_bitacora, archivo), carpeta_archivos_bitacora)
+    return carpeta_archivos_bitacora
+
+
+class CatalogoVuelos:
+    '''
+    Lista de vuelos guardada en una base de datos SQLite (vuelos.db), indexada por carpeta, por fecha y por ubicación 
+    (con un índice espacial R-tree de la extensión geográfica de cada vuelo, si SQLite lo incluye). 
+    Cada vuelo se identifica por su carpeta: guardar un vuelo cuya carpeta ya está en la lista actualiza sus datos
+    '''
+
+    COLUMNAS = ['fecha', 'hora', 'nombre', 'descripcion', 'carpeta']
+    COLUMNAS_UBICACION = ['latitud', 'longitud', 'min_latitud', 'max_latitud', 'min_longitud', 'max_longitud']
+    SQL_GUARDAR = '''
+        INSERT INTO vuelos (fecha, hora, nombre, descripcion, carpeta) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (carpeta) DO UPDATE SET 
+            fecha = excluded.fecha, hora = excluded.hora, nombre = excluded.nombre, descripcion = excluded.descripcion'''
+
+    def __init__(self, ruta_base_de_datos, ruta_lista_anterior=None) -> None:
+        '''
+        Parameters
+        ----------
+        ruta_base_de_datos : str
+            Ruta del archivo vuelos.db (se crea si no existe)
+        ruta_lista_anterior : str, optional
+            Ruta del archivo vuelos.csv usado por versiones anteriores, cuyos vuelos se copian a la base de datos la primera vez que se abre
+        '''
+        self.conexion = sqlite3.connect(ruta_base_de_datos, timeout=30)
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.create_function('distancia_km', 6, distancia_a_extension_km, deterministic=True)
+        with self.conexion:
+            self.conexion.execute('''
+                CREATE TABLE IF NOT EXISTS vuelos (
+                    id INTEGER PRIMARY KEY,
+                    fecha TEXT NOT NULL DEFAULT '',
+                    hora TEXT NOT NULL DEFAULT '',
+                    nombre TEXT NOT NULL DEFAULT '',
+                    descripcion TEXT NOT NULL DEFAULT '',
+                    carpeta TEXT NOT NULL UNIQUE
+                )''')
+            self.conexion.execute('CREATE INDEX IF NOT EXISTS vuelos_fecha ON vuelos (fecha, hora)')
+            # ubicación de cada vuelo (agregada en la versión 2 de la base de datos)
+            columnas_existentes = [columna['name'] for columna in self.conexion.execute('PRAGMA table_info(vuelos)')]
+            for columna in self.COLUMNAS_UBICACION:
+                if columna not in columnas_existentes:
+                    self.conexion.execute('ALTER TABLE vuelos ADD COLUMN ' + columna + ' REAL')
+            # vuelos cuya ubicación falta completar con los datos de su carpeta (agregada en la versión 3, ver completar_ubicaciones)
+            if 'ubicacion_pendiente' not in columnas_existentes:
+                self.conexion.execute('ALTER TABLE vuelos ADD COLUMN ubicacion_pendiente INTEGER NOT NULL DEFAULT 0')
+            # índice espacial (si SQLite no incluye el módulo R-tree, se usan índices comunes sobre las coordenadas)
+            try:
+                self.conexion.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS vuelos_extension 
+                    USING rtree(id, min_longitud, max_longitud, min_latitud, max_latitud)''')
+                self.rtree = True
+            except sqlite3.OperationalError:
+                self.conexion.execute('CREATE INDEX IF NOT EXISTS vuelos_latitud ON vuelos (min_latitud, max_latitud)')
+                self.conexion.execute('CREATE INDEX IF NOT EXISTS vuelos_longitud ON vuelos (min_longitud, max_longitud)')
+                self.rtree = False
+        version = self.conexion.execute('PRAGMA user_version').fetchone()[0]
+        # migrar la lista de vuelos de las versiones anteriores (una sola vez)
+        if version < 1:
+            with self.conexion:
+                if ruta_lista_anterior is not None and os.path.exists(ruta_lista_anterior):
+                    lista_vuelos = pd.read_csv(ruta_lista_anterior, index_col=0, dtype=str, keep_default_na=False)
+                    lista_vuelos = lista_vuelos.reindex(columns=self.COLUMNAS, fill_value='')
+                    self.conexion.executemany(self.SQL_GUARDAR, lista_vuelos.itertuples(index=False, name=None))
+                self.conexion.execute('PRAGMA user_version = 1')
+        # marcar los vuelos ya guardados sin ubicación, para completarla luego con su archivo bitacora.csv (ver completar_ubicaciones)
+        if version < 3:
+            with self.conexion:
+                self.conexion.execute('UPDATE vuelos SET ubicacion_pendiente = 1 WHERE latitud IS NULL')
+                self.conexion.execute('PRAGMA user_version = 3')
+
+    def guardar(self, info, extension=None) -> int:
+        '''
+        Agrega el vuelo a la lista, o actualiza sus datos si la carpeta ya está en la lista
+
+        Parameters
+        ----------
+        info : dict
+            Datos del vuelo (Vuelo.info)
+        extension : tuple of float, optional
+            Extensión geográfica del vuelo (longitud mínima, latitud mínima, longitud máxima, latitud máxima), 
+            por defecto la ubicación indicada en info
+
+        Returns
+        -------
+        id
+            Identificador del vuelo en la lista
+        '''
+        datos_vuelo = (
+            str(info['fecha']),
+            str(info['hora'])[0:5],    # solo la hora y los minutos
+            str(info['nombre']),
+            str(info['descripcion']),
+            info['carpeta'],
+        )
+        with self.conexion:
+            self.conexion.execute(self.SQL_GUARDAR, datos_vuelo)
+            id = self.conexion.execute('SELECT id FROM vuelos WHERE carpeta = ?', (info['carpeta'],)).fetchone()[0]
+            self.guardar_ubicacion(id, info, extension)
+        return id
+
+    def completar_ubicaciones(self) -> None:
+        '''
+        Completa la ubicación de los vuelos guardados por versiones anteriores con las coordenadas de su archivo bitacora.csv, 
+        leyendo de cada archivo sólo los identificadores y los valores de las variables
+
+        Los vuelos cuya carpeta no se puede leer (por ejemplo, una unidad de red desconectada) quedan pendientes para la próxima vez. 
+        Como lee un archivo por vuelo, la interfaz gráfica lo ejecuta en segundo plano, con otra conexión a la base de datos
+        '''
+        id_variable = {variable: id for id, variable in abrir_registro_variables().variable_por_id.items()}
+        for id, carpeta in self.conexion.execute('SELECT id, carpeta FROM vuelos WHERE ubicacion_pendiente = 1').fetchall():
+            try:
+                datos = pd.read_csv(os.path.join(carpeta, 'bitacora.csv'), header=None, usecols=[0, 2], index_col=0, dtype=str, keep_default_na=False)[2]
+            except (OSError, ValueError, pd.errors.ParserError):
+                continue
+            with self.conexion:
+                self.guardar_ubicacion(id, {variable: datos.get(id_variable[variable]) for variable in ('latitud', 'longitud')})
+
+    def guardar_ubicacion(self, id, info, extension=None) -> None:
+        # guardar la ubicación del vuelo (punto central y extensión) y actualizar el índice espacial
+        latitud = pd.to_numeric(info.get('latitud'), errors='coerce')
+        longitud = pd.to_numeric(info.get('longitud'), errors='coerce')
+        if extension is None and pd.notna(latitud) and pd.notna(longitud):
+            extension = (longitud, latitud, longitud, latitud)
+        if extension is not None and (pd.isna(latitud) or pd.isna(longitud)):
+            longitud, latitud = (extension[0] + extension[2]) / 2, (extension[1] + extension[3]) / 2
+        if extension is None:
+            ubicacion = (None, None, None, None, None, None)
+        else:
+            min_longitud, min_latitud, max_longitud, max_latitud = (float(valor) for valor in extension)
+            ubicacion = (float(latitud), float(longitud), min_latitud, max_latitud, min_longitud, max_longitud)
+        self.conexion.execute(
+            'UPDATE vuelos SET ' + ', '.join(columna + ' = ?' for columna in self.COLUMNAS_UBICACION) + ', ubicacion_pendiente = 0 WHERE id = ?', 
+            ubicacion + (id,))
+        if self.rtree:
+            self.conexion.execute('DELETE FROM vuelos_extension WHERE id = ?', (id,))
+            if extension is not None:
+                self.conexion.execute('INSERT INTO vuelos_extension VALUES (?, ?, ?, ?, ?)', (id, min_longitud, max_longitud, min_latitud, max_latitud))
+
+    def borrar(self, id) -> None:
+        with self.conexion:
+            self.conexion.execute('DELETE FROM vuelos WHERE id = ?', (id,))
+            if self.rtree:
+                self.conexion.execute('DELETE FROM vuelos_extension WHERE id = ?', (id,))
+
+    def vuelo(self, id):
+        # datos de un vuelo (sqlite3.Row, o None si no existe)
+        return self.conexion.execute('SELECT * FROM vuelos WHERE id = ?', (id,)).fetchone()
+
+    def buscar(self, extension=None, centro=None, radio_km=1, desde=None, hasta=None, texto=None, desde_id=0, cantidad=-1):
+        '''
+        Busca vuelos por ubicación, fecha y texto (los criterios indicados se combinan)
+
+        Parameters
+        ----------
+        extension : tuple of float, optional
+            Vuelos cuya extensión se superpone con el rectángulo (longitud mínima, latitud mínima, longitud máxima, latitud máxima)
+        centro : tuple of float, optional
+            Vuelos a menos de radio_km kilómetros del punto (latitud, longitud)
+        radio_km : float, default=1
+            Radio de búsqueda alrededor de centro, en kilómetros
+        desde, hasta : str, optional
+            Vuelos entre dos fechas (en formato 'aaaa-mm-dd', inclusive)
+        texto : str, optional
+            Vuelos con el texto en el nombre o la descripción
+        desde_id : int, default=0
+            Devolver los vuelos siguientes a este id (para recorrer los resultados por páginas)
+        cantidad : int, default=-1
+            Cantidad máxima de vuelos (-1: todos)
+
+        Returns
+        -------
+        vuelos
+            list de sqlite3.Row, en el orden en que se agregaron los vuelos
+        '''
+        condiciones = ['id > ?']
+        parametros = [desde_id]
+        rectangulos = []
+        if extension is not None:
+            rectangulos.append(extension)
+        if centro is not None:
+            # buscar primero en el rectángulo que contiene al círculo, y luego calcular la distancia
+            latitud, longitud = centro
+            delta_latitud = radio_km / 111.32
+            delta_longitud = radio_km / (111.32 * max(math.cos(math.radians(latitud)), 0.01))
+            rectangulos.append((longitud - delta_longitud, latitud - delta_latitud, longitud + delta_longitud, latitud + delta_latitud))
+            condiciones.append('distancia_km(?, ?, min_latitud, max_latitud, min_longitud, max_longitud) <= ?')
+            parametros += [latitud, longitud, radio_km]
+        for rectangulo in rectangulos:
+            min_longitud, min_latitud, max_longitud, max_latitud = rectangulo
+            superposicion = 'max_longitud >= ? AND min_longitud <= ? AND max_latitud >= ? AND min_latitud <= ?'
+            if self.rtree:
+                condiciones.append('id IN (SELECT id FROM vuelos_extension WHERE ' + superposicion + ')')
+                parametros += [min_longitud, max_longitud, min_latitud, max_latitud]
+            # (el índice R-tree guarda las coordenadas con menor precisión, por eso se verifican también las coordenadas exactas)
+            condiciones.append(superposicion)
+            parametros += [min_longitud, max_longitud, min_latitud, max_latitud]
+        if desde is not None:
+            condiciones.append('fecha >= ?')
+            parametros.append(desde)
+        if hasta is not None:
+            condiciones.append("fecha <= ? AND fecha != ''")
+            parametros.append(hasta)
+        if texto:
+            condiciones.append('(nombre LIKE ? OR descripcion LIKE ?)')
+            parametros += ['%' + texto + '%'] * 2
+        consulta = 'SELECT * FROM vuelos WHERE ' + ' AND '.join(condiciones) + ' ORDER BY id LIMIT ?'
+        return self.conexion.execute(consulta, parametros + [cantidad]).fetchall()
+
+    def listar(self, desde_id=0, cantidad=-1):
+        # vuelos en el orden en que se agregaron, a partir del vuelo siguiente a desde_id (cantidad=-1: todos)
+        return self.buscar(desde_id=desde_id, cantidad=cantidad)
+
+    def cerrar(self) -> None:
+        self.conexion.close()
+
+
+def distancia_a_extension_km(latitud, longitud, min_latitud, max_latitud, min_longitud, max_longitud):
+    # distancia en km entre un punto y el punto más cercano de la extensión de un vuelo (fórmula del haversine)
+    if min_latitud is None:
+        return None
+    latitud_cercana = min(max(latitud, min_latitud), max_latitud)
+    longitud_cercana = min(max(longitud, min_longitud), max_longitud)
+    lat1, lon1, lat2, lon2 = map(math.radians, (latitud, longitud, latitud_cercana, longitud_cercana))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0088 * math.asin(math.sqrt(a))
+
+
+def interpretar_filtro(texto):
+    '''
+    Convierte el texto del filtro de la lista de vuelos en los criterios de búsqueda de CatalogoVuelos.buscar. 
+    Cada palabra puede ser:
+    - una fecha o un período: '2023', '2023-03', '2023-03-15', o un rango '2023-03-01..2023-04-15'
+    - un punto y un radio en km: '-37.3,-59.1' (1 km) o '-37.3,-59.1,5'
+    - un rectángulo: '-37.3,-59.2,-37.2,-59.1' (latitud y longitud de dos esquinas opuestas)
+    - cualquier otro texto, que se busca en el nombre y la descripción
+    '''
+    criterios = {}
+    palabras = []
+    for palabra in texto.split():
+        fechas = palabra.split('..')
+        if all(re.fullmatch(r'\d{4}(-\d{2}(-\d{2})?)?', fecha) for fecha in fechas) and len(fechas) <= 2:
+            # las fechas se comparan como texto: '2023-03' va desde '2023-03' hasta '2023-03-99'
+            criterios['desde'] = fechas[0]
+            criterios['hasta'] = fechas[-1] + '-99' * (2 - fechas[-1].count('-'))
+            continue
+        try:
+            numeros = [float(numero) for numero in palabra.lower().replace('km', '').split(',')]
+        except ValueError:
+            numeros = []
+        if len(numeros) in (2, 3):
+            criterios['centro'] = (numeros[0], numeros[1])
+            if len(numeros) == 3: criterios['radio_km'] = numeros[2]
+        elif len(numeros) == 4:
+            latitudes, longitudes = sorted(numeros[0::2]), sorted(numeros[1::2])
+            criterios['extension'] = (longitudes[0], latitudes[0], longitudes[1], latitudes[1])
+        else:
+            palabras.append(palabra)
+    if palabras:
+        criterios['texto'] = ' '.join(palabras)
+    return criterios
+
+
+def generar_descripcion(vuelo):
+    nombre = ''
+    localidad=vuelo.info['localidad']
+    fecha=vuelo.info['fecha']
+    hora=vuelo.info['hora']
+    # agregar fecha
+    if fecha!='':
+        if nombre!='': nombre += ', '
+        nombre = nombre + fecha
+    # agregar hora
+    if hora!='':
+        if nombre!='': nombre += ', '
+        nombre = nombre + hora[0:5]    # solo la hora y los minutos
+    # agregar localidad
+    if localidad!='':
+        if nombre!='': nombre += ', '
+        nombre = nombre + localidad.split(',')[0]    # sólo el nombre de la ciudad
+    return nombre
 
-            # open a plain text file for output
-            nombre_kml = os.path.join(self.carpeta, self.bitacora_kml)
-            with open(nombre_kml, 'w') as output:
-                    
-                    # set up the document header
-                    output.write('<?xml version="1.0" encoding="utf-8" ?>\n')
-                    output.write('<kml xmlns="http://www.opengis.net/kml/2.2">>\n')
-                    output.write('<Document>\n')
-                    output.write('<name>' + self.info['nombre'] + '</name>\n\n\n')
-
-                    # tipos de archivo a exportar
-                    tipos_archivo = ['plan de vuelo', 'polígono', 'imagen']
-                    for tipo_archivo in tipos_archivo:
-
-                        # identificar los elementos que corresponden al tipo de archivo
-                        #elementos = self.elementos.loc[self.elementos.tipo_archivo == tipo_archivo]
-                        elementos = self.elementos.loc[(self.elementos.tipo_archivo == tipo_archivo) & (pd.notna(self.elementos.geometry))]
-                        if tipo_archivo=='imagen':
-                            # sólo exportar las imagenes con coordenadas
-                            elementos = elementos.loc[pd.notna(elementos.geometry)]
-
-                        if len(elementos) > 0:
-                            # crear carpeta
-                            output.write('  <Folder><name>' + tipo_archivo + '</name>\n')
-
-                            # exportar cada elemento
-                            for i, elemento in elementos.iterrows():
-                                # nombre del archivo
-                                output.write('    <Placemark>\n')
-                                output.write('      <name>' + elemento.archivo + '</name>\n')
-                                # datos del archivo
-                                if tipo_archivo=='imagen':
-                                    lista_variables = ['archivo','subcarpeta','tamanio','fecha','hora','latitud','longitud','altitud','camara','exposicion','iso']
-                                else:
-                                    lista_variables = ['archivo','subcarpeta','tamanio']
-                                output.write('      <ExtendedData>\n')
-                                for dato in lista_variables:
-                                    output.write('        <Data name="' + dato + '">\n')
-                                    output.write('          <value>' + str(elemento[dato]) + '</value>\n')
-                                    output.write('        </Data>\n')
-                                output.write('      </ExtendedData>\n')
-                                # exportar elemento
-                                if tipo_archivo=='imagen':
-                                    # link para mostrar la imagen al hacer clic
-                                    output.write("      <description><![CDATA[<img src='file:///" + os.path.join(self.carpeta, elemento.subcarpeta, elemento.archivo) +"'  width='200' />]]> </description>\n")
-                                    # estilo del icono
-                                    output.write('      <Style>\n')
-                                    output.write('        <IconStyle><Icon><href>http://maps.google.com/mapfiles/kml/shapes/placemark_square.png</href></Icon></IconStyle>\n')    # icono
-                                    output.write('        <LabelStyle><scale>0</scale></LabelStyle>\n')   # que no muestre el nombre de todas las imágenes
-                                    output.write('      </Style>\n')
-                                    # coordenadas de la imagen
-                                    output.write('      <Point><coordinates>\n')
-                                    output.write('          ' + str(elemento.longitud) + ',' + str(elemento.latitud) + ',' + str(elemento.altitud) + '\n')    # coordenadas
-                                    output.write('      </coordinates><altitudeMode>clampToGround</altitudeMode></Point>\n') 
-                                if tipo_archivo=='plan de vuelo':
-                                    # línea del plan de vuelo
-                                    output.write('    <Style><LineStyle><color>cc15f8ff</color><width>8</width></LineStyle></Style>\n')       # color de línea amarillo 80%
-                                    output.write('      <MultiGeometry><LineString><coordinates>\n')
-                                    puntos = LineString(loads(str(elemento.geometry)))
-                                    for x,y in zip(puntos.coords.xy[0], puntos.coords.xy[1]):
-                                        output.write('          ' + str(x) + ',' + str(y) + ',0\n')
-                                    output.write('      </coordinates></LineString></MultiGeometry>\n')  
-                                if tipo_archivo=='polígono':
-                                    # área del polígono
-                                    output.write('    <Style><PolyStyle><color>330b07e8</color><width>8</width><fill>1</fill><outline>0</outline></PolyStyle></Style>\n')       # color de relleno rojo 20%
-                                    output.write('      <MultiGeometry><Polygon><outerBoundaryIs><LinearRing><coordinates>\n')
-                                    puntos = Polygon(loads(str(elemento.geometry)))
-                                    for x,y in zip(puntos.exterior.coords.xy[0], puntos.exterior.coords.xy[1]):
-                                        output.write('          ' + str(x) + ',' + str(y) + ',0\n')
-                                    output.write('      </coordinates></LinearRing></outerBoundaryIs></Polygon></MultiGeometry>\n')                                                                                                         
-                                
-                                # cerrar placemark
-                                output.write('    </Placemark>\n')
-                            
-                            # cerrar carpeta
-                            output.write('  </Folder>\n\n\n')
-
-                    # fin del archivo kml
-                    output.write('</Document>\n')
-                    output.write('</kml>\n')
 
 
+###################
+# PROCESAMIENTO EN LOTE (SIN INTERFAZ GRÁFICA)
+
+
+def procesar_vuelo(carpeta, idioma='es', kmz=False):
+    '''
+    Procesa un vuelo completo sin interfaz gráfica: importa los archivos de la carpeta, actualiza los datos, 
+    crea el mapa y guarda bitacora.csv, bitacora.kml y bitacora.png (y opcionalmente bitacora.kmz)
+
+    Parameters
+    ----------
+    carpeta : str
+        Carpeta del vuelo
+    idioma : str, default='es'
+        Idioma de los nombres de las variables en bitacora.csv
+    kmz : bool, default=False
+        Define si se guarda también bitacora.kmz, con miniaturas de las imágenes
+
+    Returns
+    -------
+    resumen
+        dict con el estado ('ok' o 'error'), mensaje de error, cantidad de archivos e imágenes, duración en segundos, 
+        y los datos del vuelo para la lista de vuelos (info y extensión geográfica)
+    '''
+    inicio = time.perf_counter()
+    resumen = {'carpeta': carpeta, 'estado': 'ok', 'mensaje': '', 'archivos': 0, 'imagenes': 0, 'segundos': 0, 'info': None, 'extension': None}
+    try:
+        # si el vuelo ya fue procesado, conservar los datos de bitacora.csv (el nombre, la descripción y los datos ingresados por el usuario)
+        vuelo = Vuelo(carpeta=carpeta, leer_bitacora=True, idioma=idioma)
+        vuelo.info['idioma'] = idioma
+        if not str(vuelo.info['nombre'] or ''):
+            vuelo.info['nombre'] = os.path.basename(os.path.normpath(carpeta))
+        vuelo.info['descripcion'] = str(vuelo.info['descripcion'] or '')
+        # importar los archivos (sin mostrar el listado de archivos importados), actualizar los datos y crear el mapa
+        vuelo.importar(carpeta, manifiesto=True, mostrar=False)
+        vuelo.actualizar_datos()
+        if vuelo.info['descripcion'] == '':
+            vuelo.info['descripcion'] = generar_descripcion(vuelo)
+        vuelo.crear_mapa(tamanio=8, mosaico=True, imagenes=True, poligono=True, plan_de_vuelo=True, calidad='exportar')
+        # guardar resultados
+        vuelo.guardar_png()
+        vuelo.guardar_csv()
+        vuelo.guardar_kml()
+        if kmz:
+            # los vuelos ya se procesan en paralelo, por lo que las miniaturas de cada vuelo se crean en un solo proceso
+            vuelo.guardar_kmz(procesos=1)
+        resumen['archivos'] = len(vuelo.elementos)
+        resumen['imagenes'] = vuelo.info['cantidad_de_imagenes']
+        resumen['info'] = vuelo.info
+        resumen['extension'] = vuelo.extension_geografica()
+    except Exception as error:
+        resumen['estado'] = 'error'
+        resumen['mensaje'] = type(error).__name__ + ': ' + str(error)
+    resumen['segundos'] = time.perf_counter() - inicio
+    return resumen
+
+
+def listar_carpetas_de_vuelos(raiz):
+    # cada subcarpeta de la carpeta raíz que contenga algún archivo compatible se considera un vuelo
+    carpetas = []
+    for entrada in listar_entradas(raiz):
+        if entrada.is_dir() and next(recorrer_carpeta(entrada.path), None) is not None:
+            carpetas.append(entrada.path)
+    return carpetas
+
+
+def procesar_en_lote(argumentos):
+    '''
+    Procesa varios vuelos en paralelo desde la línea de comandos, y los agrega a la lista de vuelos
+
+    Parameters
+    ----------
+    argumentos : list of str
+        Argumentos de la línea de comandos (ver 'bitacora.py --help')
+
+    Returns
+    -------
+    codigo
+        0 si todos los vuelos se procesaron correctamente, 1 si hubo errores
+    '''
+    parser = argparse.ArgumentParser(prog='bitacora', description='Procesa vuelos sin abrir la interfaz gráfica')
+    parser.add_argument('carpetas', nargs='*', help='carpetas de vuelos a procesar')
+    parser.add_argument('--raiz', action='append', default=[], help='carpeta con una subcarpeta por cada vuelo (se puede indicar más de una vez)')
+    parser.add_argument('--procesos', type=int, default=0, help='cantidad de vuelos a procesar en paralelo (por defecto, uno por núcleo del procesador)')
+    parser.add_argument('--kmz', action='store_true', help='guardar también bitacora.kmz, con miniaturas de las imágenes para Google Earth')
+    parser.add_argument('--reanudar', action='store_true', help='omitir las carpetas que se procesaron correctamente en la ejecución anterior')
+    parser.add_argument('--idioma', default=None, help='idioma de bitacora.csv (por defecto, el configurado en la interfaz gráfica)')
+    argumentos = parser.parse_args(argumentos)
+
+    # archivos del programa
+    carpeta_archivos_bitacora = preparar_carpeta_archivos_bitacora()
+    ruta_archivo_inicio = os.path.join(carpeta_archivos_bitacora, 'bitacora.ini')
+    ruta_archivo_vuelos = os.path.join(carpeta_archivos_bitacora, 'vuelos.db')
+    ruta_lista_anterior = os.path.join(carpeta_archivos_bitacora, 'vuelos.csv')
+    ruta_registro = os.path.join(carpeta_archivos_bitacora, 'procesamiento_en_lote.csv')
+    idioma = argumentos.idioma
+    if idioma is None:
+        idioma = pd.read_csv(ruta_archivo_inicio).set_index('variable').valor['idioma']
+        if idioma == '-': idioma = 'es'
+
+    # carpetas a procesar (con el mismo formato de ruta que usa la interfaz gráfica)
+    carpetas = list(argumentos.carpetas)
+    for raiz in argumentos.raiz:
+        carpetas += listar_carpetas_de_vuelos(raiz)
+    carpetas = [os.path.abspath(carpeta).replace(os.sep, '/') for carpeta in carpetas]
+    carpetas = list(dict.fromkeys(carpetas))
+
+    # registro de las carpetas procesadas, para poder reanudar el procesamiento si se interrumpe
+    procesadas = set()
+    if argumentos.reanudar and os.path.exists(ruta_registro):
+        registro_anterior = pd.read_csv(ruta_registro, dtype=str, keep_default_na=False)
+        procesadas = set(registro_anterior.loc[registro_anterior['estado'] == 'ok', 'carpeta'])
+    else:
+        with open(ruta_registro, 'w', encoding='utf-8', newline='') as archivo_registro:
+            csv.writer(archivo_registro).writerow(['carpeta', 'estado', 'mensaje'])
+    omitidas = [carpeta for carpeta in carpetas if carpeta in procesadas]
+    carpetas = [carpeta for carpeta in carpetas if carpeta not in procesadas]
+    print('Carpetas a procesar: ' + str(len(carpetas)) + (' (omitidas por estar ya procesadas: ' + str(len(omitidas)) + ')' if omitidas else ''))
+
+    catalogo_vuelos = CatalogoVuelos(ruta_archivo_vuelos, ruta_lista_anterior)
+    errores = 0
+
+    def registrar_resultado(resumen):
+        # mostrar el resumen del vuelo, y guardar el resultado en el registro y en la lista de vuelos
+        nonlocal errores
+        if resumen['estado'] == 'ok':
+            print('ok     {:8.1f} s  {:6d} archivos  {:6d} imágenes  {}'.format(resumen['segundos'], resumen['archivos'], resumen['imagenes'], resumen['carpeta']))
+            catalogo_vuelos.guardar(resumen['info'], resumen['extension'])
+        else:
+            errores += 1
+            print('error  {:8.1f} s  {}  ({})'.format(resumen['segundos'], resumen['carpeta'], resumen['mensaje']))
+        with open(ruta_registro, 'a', encoding='utf-8', newline='') as archivo_registro:
+            csv.writer(archivo_registro).writerow([resumen['carpeta'], resumen['estado'], resumen['mensaje']])
+
+    procesos = argumentos.procesos or os.cpu_count() or 1
+    if procesos == 1 or len(carpetas) <= 1:
+        for carpeta in carpetas:
+            registrar_resultado(procesar_vuelo(carpeta, idioma, argumentos.kmz))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            futuros = [ejecutor.submit(procesar_vuelo, carpeta, idioma, argumentos.kmz) for carpeta in carpetas]
+            for futuro in concurrent.futures.as_completed(futuros):
+                registrar_resultado(futuro.result())
+
+    catalogo_vuelos.cerrar()
+    print('Vuelos procesados: ' + str(len(carpetas) - errores) + ' - Errores: ' + str(errores))
+    return 0 if errores == 0 else 1
 
 
 
@@ -741,6 +2381,23 @@ class Vuelo:
 
 if __name__ == "__main__":
 
+    # necesario para la importación en paralelo en el ejecutable de Windows
+    multiprocessing.freeze_support()
+
+    # si se indican carpetas en la línea de comandos, procesarlas sin abrir la interfaz gráfica
+    if len(sys.argv) > 1:
+        sys.exit(procesar_en_lote(sys.argv[1:]))
+
+    # tkinter para interfaz gráfica
+    import tkinter
+    from tkinter import ttk
+    import tkinter.simpledialog
+    import tkinter.messagebox
+    from tkinter.filedialog import askdirectory
+    from PIL import ImageTk
+
+    # para abrir carpetas de archivos
+    import webbrowser
 
     #########
     # IDIOMA
@@ -749,11 +2406,30 @@ if __name__ == "__main__":
         ''' abre el archivo de traducciones
         '''
         global traducciones
-        traducciones = pd.read_excel(ruta_archivo_traducciones, engine='openpyxl')
+        traducciones = leer_excel(ruta_archivo_traducciones)
         global lista_idiomas_codigos
         global lista_idiomas_nombres
         lista_idiomas_codigos = traducciones.columns.to_list()
         lista_idiomas_nombres = traducciones.iloc[0, :].to_list()
+        # diccionarios de traducción de cada par de idiomas (se arman la primera vez que se usan)
+        global diccionarios_traduccion
+        diccionarios_traduccion = {}
+        # textos nuevos, que se agregan al archivo de traducciones al salir o cada cierto tiempo (ver guardar_traducciones)
+        global textos_sin_traducir
+        textos_sin_traducir = []
+
+
+    def diccionario_traduccion(idioma_origen, idioma_destino):
+        ''' devuelve un diccionario {texto: traducción} para un par de idiomas
+            (si un texto no está traducido, su traducción es el mismo texto)
+        '''
+        if (idioma_origen, idioma_destino) not in diccionarios_traduccion:
+            diccionario = {}
+            for texto, traduccion in zip(traducciones[idioma_origen], traducciones[idioma_destino]):
+                if texto != '' and texto not in diccionario:
+                    diccionario[texto] = traduccion if traduccion != '' else texto
+            diccionarios_traduccion[(idioma_origen, idioma_destino)] = diccionario
+        return diccionarios_traduccion[(idioma_origen, idioma_destino)]
 
 
     def _(texto, idioma_origen='', idioma_destino=''):
@@ -770,23 +2446,47 @@ if __name__ == "__main__":
             idioma_destino = idioma
 
         # chequear si el texto ya está traducido en el listado
-        if texto in traducciones[idioma_origen].to_list():
-            posicion = traducciones[idioma_origen].to_list().index(texto)
-            traduccion = traducciones.loc[posicion, idioma_destino]
-            if traduccion=='' or traducciones.isnull().loc[posicion, idioma_destino]:
-                return texto
-            else:
-                return traduccion
-        # si no está traducido, agregarlo al listado para que pueda ser traducido después
+        traduccion = diccionario_traduccion(idioma_origen, idioma_destino).get(texto)
+        if traduccion is not None:
+            return traduccion
+        # si no está traducido, agregarlo a la lista de textos nuevos para que pueda ser traducido después
         else:
-            traducciones.loc[traducciones.index.max() + 1] = ''
-            traducciones.loc[traducciones.index.max(), idioma_origen] = texto
-            writer = pd.ExcelWriter(ruta_archivo_traducciones, engine='xlsxwriter')
-            #traducciones.reset_index(drop=False).to_excel(writer, sheet_name='Traducciones', index=False)
-            traducciones.to_excel(writer, sheet_name='Traducciones', index=False)
-            writer.save()
+            for (origen, destino), diccionario in diccionarios_traduccion.items():
+                if origen == idioma_origen:
+                    diccionario[texto] = texto
+            textos_sin_traducir.append((idioma_origen, texto))
             return texto
 
+
+    def guardar_traducciones():
+        ''' agrega los textos nuevos al archivo de traducciones
+        '''
+        global traducciones
+        global textos_sin_traducir
+        if len(textos_sin_traducir) == 0:
+            return
+        filas_nuevas = []
+        for idioma_origen, texto in dict.fromkeys(textos_sin_traducir):
+            if texto not in set(traducciones[idioma_origen]):
+                fila = dict.fromkeys(traducciones.columns, '')
+                fila[idioma_origen] = texto
+                filas_nuevas.append(fila)
+        tabla = pd.concat([traducciones, pd.DataFrame(filas_nuevas, columns=traducciones.columns)], ignore_index=True)
+        try:
+            with pd.ExcelWriter(ruta_archivo_traducciones, engine='xlsxwriter') as writer:
+                tabla.to_excel(writer, sheet_name='Traducciones', index=False)
+        except OSError:
+            # por ejemplo, si el archivo está abierto en Excel (se vuelve a intentar la próxima vez)
+            return
+        traducciones = tabla
+        textos_sin_traducir = []
+
+
+    def guardar_traducciones_periodicamente():
+        guardar_traducciones()
+        ventana.after(INTERVALO_GUARDAR_TRADUCCIONES, guardar_traducciones_periodicamente)
+
+
     def elegir_idioma():
         ''' interfaz para elegir el idioma de la aplicación
         '''
@@ -841,83 +2541,249 @@ if __name__ == "__main__":
     def leer_variables_inicio():
         global variables_inicio
         global idioma
-        global lista_vuelos
         # leer variables de configuración del programa
         variables_inicio = pd.read_csv(ruta_archivo_inicio).set_index('variable')
         idioma = variables_inicio.valor['idioma']
         print(idioma)
-        # leer lista de vuelos
-        lista_vuelos = pd.read_csv(ruta_archivo_vuelos, index_col=0, dtype=object)
-        lista_vuelos = lista_vuelos.fillna('')
+        # cantidad de procesos para leer las imágenes en paralelo (1: lectura secuencial, 0: uno por núcleo del procesador)
+        global procesos_importacion
+        procesos_importacion = int(variables_inicio.valor.get('procesos', 1))
+        if procesos_importacion == 0: procesos_importacion = None
+        # guardar también bitacora.kmz al guardar un vuelo (1: sí, 0: no)
+        global exportar_kmz
+        exportar_kmz = int(variables_inicio.valor.get('kmz', 0)) == 1
+        # abrir lista de vuelos
+        global catalogo_vuelos
+        catalogo_vuelos = CatalogoVuelos(ruta_archivo_vuelos, ruta_lista_anterior)
+        # completar en segundo plano la ubicación de los vuelos guardados por versiones anteriores 
+        # (en otro hilo, por lo que se usa otra conexión a la base de datos)
+        def completar_ubicaciones():
+            catalogo = CatalogoVuelos(ruta_archivo_vuelos)
+            try:
+                catalogo.completar_ubicaciones()
+            finally:
+                catalogo.cerrar()
+        threading.Thread(target=completar_ubicaciones, daemon=True).start()
 
 
     def guardar_variables_inicio():
         global variables_inicio
         global idioma
-        global lista_vuelos
         variables_inicio.valor['idioma'] = idioma
         variables_inicio.to_csv(ruta_archivo_inicio)
-        lista_vuelos.to_csv(ruta_archivo_vuelos)
 
 
     ####################################
     # FUNCIONES DE LA VENTANA PRINCIPAL
     
     def mostrar_lista_vuelos():
-        ''' función para actualizar la lista de vuelos en la ventana principal
+        ''' función para volver a cargar la lista de vuelos en la ventana principal
+            (los vuelos se cargan por páginas, a medida que se desplaza el listado; ver cargar_pagina_vuelos)
         '''
-        global lista_vuelos
+        global vuelos_cargados
+        global ultimo_id_cargado
+        global lista_vuelos_completa
         # limpiar listado
-        for i in listado_vuelos.get_children():
-            listado_vuelos.delete(i)
-        # completar listado
-        for i, v in lista_vuelos.iterrows():
-            fecha = v.fecha
-            hora = v.hora
-            nombre = v.nombre
-            descripcion = v.descripcion
-            listado_vuelos.insert("",'end',text=i+1,values=(fecha, hora, nombre, descripcion))
-
-    def mensaje_de_espera(texto):
-        ventana_espera = tkinter.Toplevel(ventana)
-        ventana_espera.transient()
-        ventana_espera.wm_geometry("200x75")
-        ventana_espera.title('')
-        ventana_espera.iconphoto(False, tkinter.PhotoImage(file=os.path.join(carpeta_iconos, 'icono.png')))
-        tkinter.Label(ventana_espera, text=texto).pack(expand=True)
-        return ventana_espera
-        
+        listado_vuelos.delete(*listado_vuelos.get_children())
+        vuelos_cargados = 0
+        ultimo_id_cargado = 0
+        lista_vuelos_completa = False
+        # cargar la primera página
+        cargar_pagina_vuelos()
+
+    def cargar_pagina_vuelos():
+        ''' agrega al listado la siguiente página de vuelos de la lista de vuelos
+        '''
+        global catalogo_vuelos
+        global vuelos_cargados
+        global ultimo_id_cargado
+        global lista_vuelos_completa
+        if lista_vuelos_completa: return
+        pagina = catalogo_vuelos.buscar(desde_id=ultimo_id_cargado, cantidad=TAMANIO_PAGINA_VUELOS, **filtro_vuelos)
+        # cada fila se identifica con el id del vuelo en la lista de vuelos
+        for v in pagina:
+            vuelos_cargados += 1
+            listado_vuelos.insert("",'end',iid=v['id'],text=vuelos_cargados,values=(v['fecha'], v['hora'], v['nombre'], v['descripcion']))
+        if len(pagina) > 0:
+            ultimo_id_cargado = pagina[-1]['id']
+        if len(pagina) < TAMANIO_PAGINA_VUELOS:
+            lista_vuelos_completa = True
+
+    def filtrar_vuelos(evento=None):
+        ''' vuelve a cargar la lista de vuelos mostrando sólo los que cumplen con el filtro escrito por el usuario 
+            (ver interpretar_filtro)
+        '''
+        global filtro_vuelos
+        filtro = interpretar_filtro(texto_filtro.get())
+        if filtro != filtro_vuelos:
+            filtro_vuelos = filtro
+            mostrar_lista_vuelos()
+
+    def desplazar_listado_vuelos(primero, ultimo):
+        ''' actualiza la barra de desplazamiento, y carga más vuelos cuando se llega al final del listado
+        '''
+        scrollbar.set(primero, ultimo)
+        if float(ultimo) > 0.9 and not lista_vuelos_completa:
+            ventana.after_idle(cargar_pagina_vuelos)
+
+    def actualizar_vuelo_en_listado(id):
+        ''' actualiza en el listado sólo la fila de un vuelo que se agregó o modificó
+        '''
+        global vuelos_cargados
+        global ultimo_id_cargado
+        v = catalogo_vuelos.vuelo(id)
+        valores = (v['fecha'], v['hora'], v['nombre'], v['descripcion'])
+        if listado_vuelos.exists(id):
+            listado_vuelos.item(id, values=valores)
+            return
+        # los vuelos nuevos van al final (si todavía no se cargó todo el listado, aparecerá al llegar al final), 
+        # siempre que cumplan con el filtro (el primer vuelo que lo cumple a partir de id tiene que ser este mismo)
+        if not lista_vuelos_completa: return
+        encontrados = catalogo_vuelos.buscar(desde_id=id-1, cantidad=1, **filtro_vuelos)
+        if len(encontrados) > 0 and encontrados[0]['id'] == id:
+            vuelos_cargados += 1
+            listado_vuelos.insert("",'end',iid=id,text=vuelos_cargados,values=valores)
+            ultimo_id_cargado = max(ultimo_id_cargado, id)
+
+    def quitar_vuelo_del_listado(id):
+        ''' quita del listado sólo la fila de un vuelo borrado, y renumera las filas siguientes
+        '''
+        global vuelos_cargados
+        if not listado_vuelos.exists(id): return
+        posicion = listado_vuelos.index(id)
+        listado_vuelos.delete(id)
+        vuelos_cargados -= 1
+        for i, fila in enumerate(listado_vuelos.get_children()[posicion:]):
+            listado_vuelos.item(fila, text=posicion+i+1)
+
     def abrir_vuelo(carpeta='', actualizar=False, **kwargs):
         ''' interfaz para abrir un proyecto existente
+            (los archivos se leen en segundo plano, mostrando el avance en una ventana desde la que se puede cancelar)
         '''
         tamanio_mapa = 800  # tamaño en pixels del mapa para guardar en png
+        tamanio_vista_previa = 400  # tamaño en pixels del mapa que se muestra en la ventana del vuelo
 
         # si no se especifica una carpeta, se pide al usuario
         if carpeta=='': carpeta = askdirectory(title=_('Abrir vuelo'))   # initialdir=...
-
-        # mostrar una ventana con el mensaje de espera
-        espera = mensaje_de_espera(_('Leyendo archivos') + '...')
-        espera.update()
-
-        if actualizar:
-            vuelo = Vuelo(carpeta=carpeta, leer_bitacora=False, **kwargs)
-            # importar los archivos contenidos en la carpeta y subcarpetas
-            vuelo.importar(carpeta)
-            # actualizar los datos del vuelo
-            vuelo.actualizar_datos()
-            #vuelo.nombre = nombre
-            #vuelo.datos.loc[vuelo.datos.dato=='nombre', 'valor'] = nombre
-            #vuelo.info['nombre'] = nombre
-            # crear mapa
-            vuelo.crear_mapa(tamanio=(tamanio_mapa/100), mosaico=True, imagenes=True, poligono=True, plan_de_vuelo=True)
-        
-        else:
-            vuelo = Vuelo(carpeta=carpeta, leer_bitacora=True, **kwargs)
-
-            # si no hay un archivo bitacora.csv previo, preguntar nombre y descripción
-            if not os.path.exists(os.path.join(vuelo.info['carpeta'], vuelo.bitacora_csv)):
-                vuelo.importar(carpeta)
-                vuelo.actualizar_datos()
+        if carpeta=='': return
+
+        # mensajes del proceso en segundo plano a la interfaz
+        cola = queue.Queue()
+        cancelar = threading.Event()
+
+        def procesar():
+            # se ejecuta en segundo plano, por lo que no usa la interfaz gráfica: sólo envía mensajes a la cola
+            def etapa(nombre):
+                # revisar si se canceló antes de comenzar cada etapa, y avisar a la interfaz
+                if cancelar.is_set():
+                    raise VueloCancelado()
+                cola.put(('avance', {'etapa': nombre}))
+
+            try:
+                nuevo = False
+                if actualizar:
+                    vuelo = Vuelo(carpeta=carpeta, leer_bitacora=False, **kwargs)
+                    # importar los archivos contenidos en la carpeta y subcarpetas
+                    vuelo.importar(carpeta, procesos=procesos_importacion, manifiesto=True, progreso=lambda avance: cola.put(('avance', avance)), cancelar=cancelar)
+                    # actualizar los datos del vuelo
+                    etapa('datos')
+                    vuelo.actualizar_datos()
+                    # crear mapa
+                    etapa('mapa')
+                    vuelo.crear_mapa(tamanio=(tamanio_mapa/100), mosaico=True, imagenes=True, poligono=True, plan_de_vuelo=True, calidad='vista_previa', tamanio_vista_previa=tamanio_vista_previa, cancelar=cancelar)
+                else:
+                    vuelo = Vuelo(carpeta=carpeta, leer_bitacora=True, **kwargs)
+                    # si no hay un archivo bitacora.csv previo, importar los archivos (y luego preguntar nombre y descripción)
+                    if not os.path.exists(os.path.join(vuelo.info['carpeta'], vuelo.bitacora_csv)):
+                        nuevo = True
+                        vuelo.importar(carpeta, procesos=procesos_importacion, manifiesto=True, progreso=lambda avance: cola.put(('avance', avance)), cancelar=cancelar)
+                        etapa('datos')
+                        vuelo.actualizar_datos()
+                    # si no hay un mapa bitacora.png previo, crearlo
+                    if not os.path.exists(os.path.join(vuelo.info['carpeta'], vuelo.bitacora_png)):
+                        etapa('mapa')
+                        vuelo.crear_mapa(tamanio=(tamanio_mapa/100), mosaico=True, imagenes=True, poligono=True, plan_de_vuelo=True, calidad='vista_previa', tamanio_vista_previa=tamanio_vista_previa, cancelar=cancelar)
+                if cancelar.is_set():
+                    raise VueloCancelado()
+                cola.put(('fin', vuelo, nuevo))
+            except VueloCancelado:
+                cola.put(('cancelado',))
+            except Exception as error:
+                cola.put(('error', error))
+
+        # mostrar una ventana con el avance
+        ventana_progreso = tkinter.Toplevel(ventana)
+        ventana_progreso.transient(ventana)
+        ventana_progreso.wm_geometry("420x150")
+        ventana_progreso.title('')
+        ventana_progreso.configure(background='white')
+        ventana_progreso.iconphoto(False, tkinter.PhotoImage(file=os.path.join(carpeta_iconos, 'icono.png')))
+        etiqueta_etapa = tkinter.Label(ventana_progreso, text=_('Leyendo archivos') + '...', background='white', font=('Arial', 11, 'bold'))
+        etiqueta_etapa.pack(pady=(margen_y*2, margen_y))
+        barra_progreso = ttk.Progressbar(ventana_progreso, mode='determinate', maximum=100, length=380)
+        barra_progreso.pack()
+        etiqueta_avance = tkinter.Label(ventana_progreso, text='', background='white')
+        etiqueta_avance.pack(pady=margen_y)
+
+        def cancelar_proceso():
+            cancelar.set()
+            etiqueta_etapa.configure(text=_('Cancelando') + '...')
+            boton_cancelar.configure(state=tkinter.DISABLED)
+
+        boton_cancelar = tkinter.Button(
+            ventana_progreso, text=_('Cancelar'), command=cancelar_proceso, 
+            background=color_botones, activebackground=color_botones, foreground=color_texto_botones, activeforeground=color_texto_botones, 
+            relief=tkinter.FLAT, cursor='hand2')
+        boton_cancelar.pack(pady=margen_y)
+        ventana_progreso.protocol("WM_DELETE_WINDOW", cancelar_proceso)
+        ventana_progreso.grab_set()
+
+        etapas = {'importar': _('Leyendo archivos'), 'datos': _('Actualizando datos del vuelo'), 'mapa': _('Creando mapa')}
+        inicio = time.perf_counter()
+
+        def mostrar_avance(avance):
+            if cancelar.is_set(): return
+            etiqueta_etapa.configure(text=etapas[avance['etapa']] + '...')
+            if avance['etapa'] != 'importar':
+                barra_progreso.configure(value=100)
+                return
+            # archivos leídos, imágenes por segundo y tiempo restante estimado
+            segundos = time.perf_counter() - inicio
+            encontrados, leidos = avance['archivos_encontrados'], avance['archivos_leidos']
+            texto = _('Archivos') + ': ' + str(leidos) + ' / ' + str(encontrados)
+            if segundos > 0 and avance['imagenes_leidas'] > 0:
+                texto += '  -  ' + '{:.1f}'.format(avance['imagenes_leidas'] / segundos) + ' ' + _('imágenes/s')
+            if leidos > 0 and encontrados > leidos:
+                texto += '  -  ' + _('faltan') + ' ' + str(int((encontrados - leidos) * segundos / leidos) + 1) + ' s'
+            etiqueta_avance.configure(text=texto)
+            barra_progreso.configure(value=100 * leidos / max(encontrados, 1))
+
+        def revisar_cola():
+            # procesar los mensajes recibidos del proceso en segundo plano
+            while True:
+                try:
+                    mensaje = cola.get_nowait()
+                except queue.Empty:
+                    ventana.after(100, revisar_cola)
+                    return
+                if mensaje[0] == 'avance':
+                    mostrar_avance(mensaje[1])
+                    continue
+                # el proceso terminó: cerrar la ventana con el avance
+                ventana_progreso.grab_release()
+                ventana_progreso.destroy()
+                if mensaje[0] == 'error':
+                    tkinter.messagebox.showerror(_('Bitácora'), str(mensaje[1]))
+                elif mensaje[0] == 'fin':
+                    terminar(mensaje[1], mensaje[2])
+                elif mensaje[0] == 'cancelado' and actualizar and os.path.exists(os.path.join(carpeta, 'bitacora.csv')):
+                    # al cancelar la actualización de un vuelo ya guardado, volver a mostrarlo como estaba 
+                    # (los archivos bitacora.* sólo se modifican al guardar el vuelo)
+                    abrir_vuelo(carpeta, actualizar=False)
+                return
+
+        def terminar(vuelo, nuevo):
+            if nuevo:
                 # preguntar el nombre del vuelo
                 nombre_automatico = os.path.basename(carpeta)
                 nombre = tkinter.simpledialog.askstring(
@@ -928,8 +2794,6 @@ if __name__ == "__main__":
                     initialvalue=nombre_automatico)
                 if nombre==None: nombre = nombre_automatico
                 if nombre=='': nombre = nombre_automatico
-                #vuelo.nombre = nombre
-                #vuelo.datos.loc[vuelo.datos.dato=='nombre', 'valor'] = nombre
                 vuelo.info['nombre'] = nombre
                 # preguntar descripción del vuelo
                 descripcion_automatica = generar_descripcion(vuelo)
@@ -941,36 +2805,30 @@ if __name__ == "__main__":
                     initialvalue=descripcion_automatica)
                 if descripcion==None: descripcion = descripcion_automatica
                 if descripcion=='': descripcion = descripcion_automatica
-                #vuelo.descripcion = descripcion
-                #vuelo.datos.loc[vuelo.datos.dato=='descripcion', 'valor'] = descripcion
                 vuelo.info['descripcion'] = descripcion
+            # mostrar los datos del vuelo abierto/creado
+            mostrar_vuelo(vuelo)
 
-            # si no hay un mapa bitacora.png previo, crearlo
-            if not os.path.exists(os.path.join(vuelo.info['carpeta'], vuelo.bitacora_png)):
-                vuelo.crear_mapa(tamanio=(tamanio_mapa/100), mosaico=True, imagenes=True, poligono=True, plan_de_vuelo=True)
-        
-        # cerrar la ventana con el mensaje de espera
-        espera.destroy()
-
-        # mostrar los datos del vuelo abierto/creado
-        mostrar_vuelo(vuelo)
+        threading.Thread(target=procesar, daemon=True).start()
+        revisar_cola()
 
 
     def abrir_vuelo_desde_boton():
         #seleccion = listado_vuelos.curselection()
-        seleccion = listado_vuelos.index(listado_vuelos.focus())
-        global lista_vuelos
-        carpeta = lista_vuelos.loc[seleccion, 'carpeta']
+        seleccion = listado_vuelos.focus()
+        if seleccion == '': return
+        global catalogo_vuelos
+        carpeta = catalogo_vuelos.vuelo(int(seleccion))['carpeta']
         abrir_vuelo(carpeta)
 
 
     def borrar_vuelo_desde_boton():
         #seleccion = listado_vuelos.curselection()[0]
-        seleccion = listado_vuelos.index(listado_vuelos.focus())
-        global lista_vuelos
-        lista_vuelos = lista_vuelos.drop(seleccion).reset_index(drop=True)
-        guardar_variables_inicio()
-        mostrar_lista_vuelos()
+        seleccion = listado_vuelos.focus()
+        if seleccion == '': return
+        global catalogo_vuelos
+        catalogo_vuelos.borrar(int(seleccion))
+        quitar_vuelo_del_listado(int(seleccion))
 
 
     def salir():
@@ -978,6 +2836,10 @@ if __name__ == "__main__":
         '''
         # guardar las variables de inicio
         guardar_variables_inicio()
+        # agregar los textos nuevos al archivo de traducciones
+        guardar_traducciones()
+        # cerrar la lista de vuelos
+        catalogo_vuelos.cerrar()
         # salir
         ventana.quit()
         ventana.destroy()
@@ -1026,53 +2888,17 @@ if __name__ == "__main__":
             abrir_vuelo(vuelo.info['carpeta'], actualizar=False)
 
 
-    def generar_descripcion(vuelo):
-        nombre = ''
-        localidad=vuelo.info['localidad']
-        fecha=vuelo.info['fecha']
-        hora=vuelo.info['hora']
-        # agregar fecha
-        if fecha!='':
-            if nombre!='': nombre += ', '
-            nombre = nombre + fecha
-        print(nombre)
-        # agregar hora
-        if hora!='':
-            if nombre!='': nombre += ', '
-            nombre = nombre + hora[0:5]    # solo la hora y los minutos
-        print(nombre)
-        # agregar localidad
-        if localidad!='':
-            if nombre!='': nombre += ', '
-            nombre = nombre + localidad.split(',')[0]    # sólo el nombre de la ciudad
-        print(nombre)
-        return nombre
-
-
     def guardar_vuelo(vuelo):
         # guardar resultados
         vuelo.guardar_png()
         vuelo.guardar_csv()
         vuelo.guardar_kml()
+        if exportar_kmz:
+            vuelo.guardar_kmz(procesos=procesos_importacion)
         # actualizar lista de vuelos
-        global lista_vuelos
-        fecha=vuelo.info['fecha']
-        hora=vuelo.info['hora'][0:5]    # solo la hora y los minutos
-        nombre = vuelo.info['nombre']
-        descripcion = vuelo.info['descripcion']
-        carpeta = vuelo.info['carpeta']
-        if (len(lista_vuelos.loc[lista_vuelos['carpeta']==carpeta])==0):
-            datos_vuelo = pd.DataFrame([[fecha, hora, nombre, descripcion, carpeta]], columns=lista_vuelos.columns)
-            lista_vuelos = lista_vuelos.append(datos_vuelo, ignore_index=True)
-            guardar_variables_inicio()
-            mostrar_lista_vuelos()
-        else:
-            lista_vuelos.loc[lista_vuelos['carpeta']==carpeta, 'fecha'] = fecha
-            lista_vuelos.loc[lista_vuelos['carpeta']==carpeta, 'hora'] = hora
-            lista_vuelos.loc[lista_vuelos['carpeta']==carpeta, 'nombre'] = nombre
-            lista_vuelos.loc[lista_vuelos['carpeta']==carpeta, 'descripcion'] = descripcion
-            guardar_variables_inicio()
-            mostrar_lista_vuelos()
+        global catalogo_vuelos
+        id = catalogo_vuelos.guardar(vuelo.info, vuelo.extension_geografica())
+        actualizar_vuelo_en_listado(id)
 
 
     def actualizar_vuelo(vuelo, ventana_vuelo):
@@ -1218,7 +3044,7 @@ if __name__ == "__main__":
         fila = 0
         for variable in vuelo.info:
             global idioma
-            nombre_variable = vuelo.tabla_variables.loc[vuelo.tabla_variables['variable']==variable][idioma].values[0]
+            nombre_variable = vuelo.registro_variables.nombres[idioma][variable]
             valor = vuelo.info[variable]
             if str(valor)!=valor: valor=str(valor)
             if valor != '':
@@ -1245,17 +3071,11 @@ if __name__ == "__main__":
     carpeta_original_archivos_bitacora = os.path.join(carpeta_programa, 'bitacora_archivos')
 
     # carpeta en "Documentos" con los archivos de bitacora (para que puedan ser modificados sin permisos de Administrador)
-    carpeta_documentos = shell.SHGetFolderPath(0, shellcon.CSIDL_PERSONAL, None, 0)
-    carpeta_archivos_bitacora = os.path.join(carpeta_documentos, 'bitacora_archivos')
-    # si no existe la carpeta, crearla y copiarle los archivos originales
-    if not os.path.exists(carpeta_archivos_bitacora):
-        os.makedirs(carpeta_archivos_bitacora)
-        archivos_a_copiar = ('bitacora.ini', 'vuelos.csv', 'textos_interfaz.xlsx')
-        for archivo in archivos_a_copiar:
-            shutil.copy2(os.path.join(carpeta_original_archivos_bitacora, archivo), carpeta_archivos_bitacora)
+    carpeta_archivos_bitacora = preparar_carpeta_archivos_bitacora()
 
     ruta_archivo_inicio       = os.path.join(carpeta_archivos_bitacora, 'bitacora.ini')
-    ruta_archivo_vuelos       = os.path.join(carpeta_archivos_bitacora, 'vuelos.csv')
+    ruta_archivo_vuelos       = os.path.join(carpeta_archivos_bitacora, 'vuelos.db')
+    ruta_lista_anterior       = os.path.join(carpeta_archivos_bitacora, 'vuelos.csv')    # lista de vuelos de versiones anteriores
     ruta_archivo_traducciones = os.path.join(carpeta_archivos_bitacora, 'textos_interfaz.xlsx')
     
     global carpeta_iconos
@@ -1273,13 +3093,15 @@ if __name__ == "__main__":
     # idioma de la interfaz
     global idioma
 
+    # cada cuánto se agregan los textos nuevos al archivo de traducciones (en milisegundos)
+    INTERVALO_GUARDAR_TRADUCCIONES = 60000
+
     # abrir textos y traducciones
     abrir_traducciones()
 
     # variables globales con datos del proyecto
     global ruta_vuelo
-    global lista_vuelos
-    lista_vuelos = pd.DataFrame(columns=['fecha', 'hora', 'nombre', 'carpeta'])
+    global catalogo_vuelos
 
     # variables de inicio
     leer_variables_inicio()
@@ -1360,9 +3182,28 @@ if __name__ == "__main__":
 
 
 
+    # FILTRO DE VUELOS
+    # muestra sólo los vuelos de una fecha o período, cerca de un punto, dentro de un rectángulo, o con un texto
+    global filtro_vuelos
+    filtro_vuelos = {}
+    x_filtro = margen_x+(ancho_botones+margen_x)*3+margen_x*4
+    tkinter.Label(
+        ventana, text=_('Buscar'), anchor='e', font=('Arial', 11, 'bold'), 
+        background=color_fondo_franja_superior, foreground=color_texto_botones).place(x=x_filtro, y=margen_y, height=alto_botones, width=80)
+    texto_filtro = tkinter.StringVar()
+    entrada_filtro = tkinter.Entry(ventana, textvariable=texto_filtro, font=('Calibri', 11), relief=tkinter.FLAT)
+    entrada_filtro.place(x=x_filtro+80+margen_x, y=margen_y+alto_botones/4, height=alto_botones/2, width=tam_x_ventana-x_filtro-80-margen_x*3)
+    entrada_filtro.bind('<Return>', filtrar_vuelos)
+    entrada_filtro.bind('<FocusOut>', filtrar_vuelos)
+
+
+
     ####################
     # LISTADO DE VUELOS
 
+    # cantidad de vuelos que se cargan en el listado cada vez que se llega al final
+    TAMANIO_PAGINA_VUELOS = 100
+
     # barra de desplazamiento
     x, y = tam_x_ventana-20, margen_y+tam_y_marco_botones+margen_y
     scrollbar = tkinter.Scrollbar(ventana, relief=tkinter.FLAT)
@@ -1376,7 +3217,7 @@ if __name__ == "__main__":
 
     # crear tabla
     listado_vuelos = ttk.Treeview(ventana, selectmode='browse', style="mystyle.Treeview")
-    listado_vuelos.configure(yscrollcommand=scrollbar.set)
+    listado_vuelos.configure(yscrollcommand=desplazar_listado_vuelos)
     listado_vuelos.place(x=margen_x, y=y+margen_y, height=tam_y_ventana-y-margen_y*2, width=x-margen_x*2)
     scrollbar.config(command = listado_vuelos.yview)
 
@@ -1400,6 +3241,9 @@ if __name__ == "__main__":
     # asignar función 'salir' para cuando se cierre la ventana principal
     ventana.protocol("WM_DELETE_WINDOW", salir)
 
+    # agregar cada cierto tiempo los textos nuevos al archivo de traducciones
+    ventana.after(INTERVALO_GUARDAR_TRADUCCIONES, guardar_traducciones_periodicamente)
+
     # ejecutar la ventana principal
     ventana.mainloop()
 